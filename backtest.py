@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+🔁 THRESHOLD BOT BACKTESTER
+Replays the check_bot_trades rules over daily history for many bot
+configurations at once (sell threshold, universe, alternatives).
+State for every configuration lives in (configs × positions) arrays,
+so each simulated day is a handful of NumPy operations no matter how
+many configurations are in the sweep.
+
+Usage: python backtest.py --thresholds -3 -5 -7 -10 -15 --start 2021-01-01
+"""
+
+import argparse
+import csv
+import datetime
+from pathlib import Path
+
+import numpy as np
+
+from price_history import PriceHistory
+from selection import SELECTORS, LOOKBACK
+from portfolio_tracker import BOT_TICKERS, BOT_ALTERNATIVES, BOT_POSITION_SIZE
+
+TRADE_DTYPE = np.dtype([
+    ('config', '<i4'),
+    ('day', '<i4'),
+    ('sold', '<i4'),          # Ticker columns in the price matrix
+    ('bought', '<i4'),
+    ('sold_price', '<f8'),
+    ('sold_shares', '<f8'),
+    ('bought_price', '<f8'),
+    ('bought_shares', '<f8'),
+    ('profit_loss', '<f8'),
+])
+
+def make_config(threshold, universe=None, alternatives=None, position_size=BOT_POSITION_SIZE,
+                picker='random', seed=0):
+    """One bot configuration (defaults match the live bots)"""
+    if picker not in SELECTORS:
+        raise ValueError(f"Unknown alternative picker '{picker}' (choose from {', '.join(SELECTORS)})")
+    return {
+        'threshold': float(threshold),
+        'universe': list(universe or BOT_TICKERS),
+        'alternatives': list(alternatives or BOT_ALTERNATIVES),
+        'position_size': position_size,
+        'picker': picker,
+        'seed': seed,
+    }
+
+def load_price_matrix(tickers, start=None, end=None, history=None, warmup=0):
+    """Daily closes as a (days × tickers) matrix on the union of trading dates
+
+    Gaps are forward-filled; days before a ticker's first bar stay NaN.
+    With `warmup`, up to that many sessions before `start` are included
+    too, so trailing scores are already available on `start`.
+    """
+    history = history or PriceHistory()
+    bars = {ticker: history.read(ticker, None if warmup else start, end) for ticker in tickers}
+    dates = np.unique(np.concatenate([b['date'] for b in bars.values()] or [np.zeros(0, 'M8[D]')]))
+
+    closes = np.full((len(dates), len(tickers)), np.nan)
+    for col, ticker in enumerate(tickers):
+        b = bars[ticker]
+        closes[np.searchsorted(dates, b['date']), col] = b['close']
+
+    # Forward-fill each column: carry the index of the last valid row down
+    valid = ~np.isnan(closes)
+    last = np.where(valid, np.arange(len(dates))[:, None], 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    filled = closes[last, np.arange(len(tickers))]
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+
+    lo = max(first_session(dates, start) - warmup, 0)
+    return dates[lo:], filled[lo:]
+
+def first_session(dates, start=None):
+    """Row of the first date on or after `start` (0 without a start)"""
+    return 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'D')))
+
+def trailing_scores(closes, lookback=LOOKBACK):
+    """Per-day momentum and volatility matrices matching the live selectors
+
+    Momentum is the return over the last `lookback` sessions; volatility is
+    the standard deviation of the daily log returns in that window. Both
+    are NaN until a full window of prices exists.
+    """
+    n_days = len(closes)
+    momentum = np.full(closes.shape, np.nan)
+    volatility = np.full(closes.shape, np.nan)
+    if n_days <= lookback:
+        return momentum, volatility
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        momentum[lookback:] = closes[lookback:] / closes[:-lookback] - 1
+        returns = np.diff(np.log(closes), axis=0)
+
+    # Rolling sums via cumulative sums; windows containing a gap stay NaN
+    valid = ~np.isnan(returns)
+    returns = np.where(valid, returns, 0.0)
+    zero = np.zeros((1, closes.shape[1]))
+    total = np.concatenate([zero, np.cumsum(returns, axis=0)])
+    squares = np.concatenate([zero, np.cumsum(returns ** 2, axis=0)])
+    count = np.concatenate([zero, np.cumsum(valid, axis=0)])
+
+    window_sum = total[lookback:] - total[:-lookback]
+    window_sq = squares[lookback:] - squares[:-lookback]
+    full = (count[lookback:] - count[:-lookback]) == lookback
+    mean = window_sum / lookback
+    std = np.sqrt(np.maximum(window_sq / lookback - mean ** 2, 0.0))
+    volatility[lookback:] = np.where(full, std, np.nan)
+    return momentum, volatility
+
+class BacktestResult:
+    """Equity curves and trade logs for every configuration of a run"""
+
+    def __init__(self, configs, tickers, dates, equity, trades):
+        self.configs = configs
+        self.tickers = tickers
+        self.dates = dates
+        self.equity = equity    # (configs × days)
+        self.trades = trades    # TRADE_DTYPE records for all configs, in day order
+
+    def trade_log(self, config):
+        """Trades of one configuration as dicts"""
+        rows = self.trades[self.trades['config'] == config]
+        return [{
+            'date': str(self.dates[row['day']]),
+            'soldTicker': self.tickers[row['sold']],
+            'soldPrice': round(float(row['sold_price']), 2),
+            'soldShares': float(row['sold_shares']),
+            'boughtTicker': self.tickers[row['bought']],
+            'boughtPrice': round(float(row['bought_price']), 2),
+            'boughtShares': float(row['bought_shares']),
+            'profitLoss': round(float(row['profit_loss']), 2),
+        } for row in rows]
+
+    def summary(self):
+        """Final value, return and trade count per configuration"""
+        counts = np.bincount(self.trades['config'], minlength=len(self.configs))
+        start = self.equity[:, 0]
+        final = self.equity[:, -1]
+        return [{
+            **{k: v for k, v in config.items() if k not in ('universe', 'alternatives')},
+            'final': round(float(final[c]), 2),
+            'returnPct': round(float((final[c] / start[c] - 1) * 100), 2) if start[c] else 0.0,
+            'trades': int(counts[c]),
+        } for c, config in enumerate(self.configs)]
+
+def run_backtest(configs, dates, closes, tickers, first=0):
+    """Simulate every configuration over the price matrix
+
+    Days are processed in order (each day's trades change the next day's
+    holdings) while all configurations advance together as arrays. Rows
+    before `first` are warm-up: they only feed the trailing scores.
+    """
+    column = {ticker: col for col, ticker in enumerate(tickers)}
+    n_configs = len(configs)
+    width = max(len(c['universe']) for c in configs)
+    n_alts = max(len(c['alternatives']) for c in configs)
+    rows = np.arange(n_configs)
+
+    # Per-configuration parameters
+    threshold = np.array([c['threshold'] for c in configs], dtype=np.float64)
+    alts = np.full((n_configs, n_alts), -1, dtype=np.intp)
+    for c, config in enumerate(configs):
+        alts[c, :len(config['alternatives'])] = [column[t] for t in config['alternatives']]
+    alt_slots = alts >= 0
+    rngs = [np.random.default_rng(c['seed']) for c in configs]
+    rule = np.array([c.get('picker', 'random') for c in configs])
+    random_pick = rule == 'random'
+    ranked_rule = (rule == 'momentum') | (rule == 'low_volatility')
+    if ranked_rule.any():
+        momentum, volatility = (scores[first:] for scores in trailing_scores(closes))
+    dates, closes = dates[first:], closes[first:]
+    n_days = len(dates)
+
+    # Opening positions on day 0, sized like initialize_bot_portfolio
+    held = np.zeros((n_configs, width), dtype=np.intp)
+    entry = np.ones((n_configs, width))
+    shares = np.zeros((n_configs, width))
+    active = np.zeros((n_configs, width), dtype=bool)
+    first = closes[0]
+    for c, config in enumerate(configs):
+        for k, ticker in enumerate(config['universe']):
+            price = first[column[ticker]]
+            if price > 0:
+                held[c, k], entry[c, k], active[c, k] = column[ticker], price, True
+                shares[c, k] = int(config['position_size'] / price)
+
+    equity = np.zeros((n_configs, n_days))
+    logs = []
+    for day in range(n_days):
+        prices = closes[day]
+        current = prices[held]
+
+        # First holding (in order) at or past its threshold, one trade per bot per day
+        with np.errstate(invalid='ignore'):
+            change = (current - entry) / entry * 100
+            triggered = active & (change <= threshold[:, None])
+        alt_prices = np.where(alt_slots, prices[alts], np.nan)
+        with np.errstate(invalid='ignore'):
+            valid_alts = alt_slots & (alt_prices > 0)
+        n_valid = valid_alts.sum(axis=1)
+        trading = triggered.any(axis=1) & (n_valid > 0)
+
+        if trading.any():
+            c = rows[trading]
+            k = triggered[c].argmax(axis=1)
+
+            # Pick uniformly among alternatives that have a price (seeded per
+            # config); other rules start from the first priced alternative
+            draws = np.array([rngs[i].random() if random_pick[i] else 0.0 for i in c])
+            nth = (draws * n_valid[c]).astype(np.intp)
+            pick = (np.cumsum(valid_alts[c], axis=1) > nth[:, None]).argmax(axis=1)
+
+            # Ranking rules take the best momentum / lowest volatility instead
+            ranked = ranked_rule[c]
+            if ranked.any():
+                rc = c[ranked]
+                score = np.where((rule[rc] == 'momentum')[:, None],
+                                 momentum[day][alts[rc]], -volatility[day][alts[rc]])
+                score = np.where(valid_alts[rc] & np.isfinite(score), score, -np.inf)
+                scored = np.isfinite(score).any(axis=1)
+                pick[ranked] = np.where(scored, score.argmax(axis=1), pick[ranked])
+            new_col = alts[c, pick]
+            new_price = prices[new_col]
+
+            sell_price = current[c, k]
+            sell_value = sell_price * shares[c, k]
+            new_shares = np.floor(sell_value / new_price)
+
+            log = np.zeros(len(c), dtype=TRADE_DTYPE)
+            log['config'], log['day'] = c, day
+            log['sold'], log['bought'] = held[c, k], new_col
+            log['sold_price'], log['sold_shares'] = sell_price, shares[c, k]
+            log['bought_price'], log['bought_shares'] = new_price, new_shares
+            log['profit_loss'] = sell_value - entry[c, k] * shares[c, k]
+            logs.append(log)
+
+            held[c, k], entry[c, k], shares[c, k] = new_col, new_price, new_shares
+
+        # Mark to market (positions without a quote yet are held at entry)
+        marked = np.where(np.isnan(prices[held]), entry, prices[held])
+        equity[:, day] = (marked * shares * active).sum(axis=1)
+
+    trades = np.concatenate(logs) if logs else np.zeros(0, dtype=TRADE_DTYPE)
+    return BacktestResult(configs, tickers, dates, equity, trades)
+
+def backtest(configs, start=None, end=None, history=None):
+    """Load history for every ticker the configurations touch and run them"""
+    tickers = sorted({t for c in configs for t in c['universe'] + c['alternatives']})
+    dates, closes = load_price_matrix(tickers, start, end, history, warmup=LOOKBACK)
+    first = first_session(dates, start)
+    if first == len(dates):
+        raise ValueError('No stored history for the requested tickers/range; run the tracker first')
+    return run_backtest(configs, dates, closes, tickers, first)
+
+def write_results(result, out_dir):
+    """Write equity curves, trade logs and a summary as CSV files"""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    with open(out / 'equity.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['date'] + [f'config_{c}' for c in range(len(result.configs))])
+        for day, date in enumerate(result.dates):
+            writer.writerow([str(date)] + [f'{v:.2f}' for v in result.equity[:, day]])
+
+    with open(out / 'trades.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['config', 'date', 'soldTicker', 'soldPrice', 'soldShares',
+                         'boughtTicker', 'boughtPrice', 'boughtShares', 'profitLoss'])
+        for row in result.trades:
+            writer.writerow([row['config'], str(result.dates[row['day']]),
+                             result.tickers[row['sold']], f"{row['sold_price']:.2f}", row['sold_shares'],
+                             result.tickers[row['bought']], f"{row['bought_price']:.2f}", row['bought_shares'],
+                             f"{row['profit_loss']:.2f}"])
+
+    summary = result.summary()
+    with open(out / 'summary.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['config'] + list(summary[0]))
+        writer.writeheader()
+        for c, row in enumerate(summary):
+            writer.writerow({'config': c, **row})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Backtest threshold bots over stored price history')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[-5, -7, -10],
+                        help='Sell thresholds in percent (negative)')
+    parser.add_argument('--universe', nargs='+', default=BOT_TICKERS, help='Starting holdings')
+    parser.add_argument('--alternatives', nargs='+', default=BOT_ALTERNATIVES, help='Replacement candidates')
+    parser.add_argument('--pickers', nargs='+', choices=SELECTORS, default=['random'],
+                        help='Alternative-picking rules to compare')
+    parser.add_argument('--seeds', type=int, default=1, help='Seeds per threshold for random picks')
+    parser.add_argument('--start', type=datetime.date.fromisoformat)
+    parser.add_argument('--end', type=datetime.date.fromisoformat)
+    parser.add_argument('--output', default='backtest_results')
+    args = parser.parse_args(argv)
+
+    configs = [make_config(t, args.universe, args.alternatives, picker=picker, seed=seed)
+               for t in args.thresholds for picker in args.pickers
+               for seed in (range(args.seeds) if picker == 'random' else [0])]
+    print(f"🔁 Backtesting {len(configs)} configurations...")
+    result = backtest(configs, args.start, args.end)
+    write_results(result, args.output)
+
+    print(f"✅ {len(result.dates)} sessions ({result.dates[0]} → {result.dates[-1]}), "
+          f"{len(result.trades)} trades • results in {args.output}/")
+    for c, row in sorted(enumerate(result.summary()), key=lambda r: -r[1]['final'])[:10]:
+        print(f"  #{c:<5} threshold {row['threshold']:>6}% {row['picker']}:{row['seed']:<4} "
+              f"${row['final']:>12,.0f} ({row['returnPct']:+.2f}%) {row['trades']} trades")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+⏱️ PIPELINE BENCHMARK
+Runs the tracker's main() end to end on synthetic portfolio configs and
+state shards of increasing size (portfolios, holdings per portfolio,
+trade history), with fetch_current_prices replaced by a deterministic
+local price generator, and reports the time of every stage. --retired N
+adds N inactive portfolios, whose shards a run should never touch.
+Results can be saved as JSON tagged with the commit and compared
+against another run.
+
+Usage: python benchmarks/bench_pipeline.py [--repeat N] [--retired N] [--json out.json] [--compare old.json]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import portfolio_tracker
+from dashboard import write_dashboard
+from metrics import EquityMetrics
+from models import Holding, Portfolio, Trade
+from portfolio_store import CONFIG_DIR, META_FILE, STATE_DIR
+from serializer import dumps
+from valuation import Valuation
+
+# (extra portfolios, holdings per portfolio, trades per bot)
+SCALES = [
+    (0, 10, 10),
+    (20, 50, 1000),
+    (100, 200, 10000),
+    (500, 500, 50000),
+]
+
+BOT_THRESHOLDS = {'conservative': -10, 'moderate': -7, 'aggressive': -5}
+
+def stub_price(ticker):
+    """Deterministic price for a ticker (same on every run and machine)"""
+    digest = int(hashlib.md5(ticker.encode()).hexdigest(), 16)
+    return round(20 + digest % 40000 / 100, 2)
+
+def stub_fetch(tickers, **kwargs):
+    return {ticker: stub_price(ticker) for ticker in tickers}
+
+def synthetic_state(extra, holdings, trades, retired=0, seed=0):
+    """Config and state shard files (relative path -> bytes) at the given scale"""
+    rng = random.Random(seed)
+    universe = portfolio_tracker.BOT_TICKERS + [f'SYN{i:04d}' for i in range(max(holdings * 2, 50))]
+
+    def positions(count):
+        picks = rng.sample(universe, min(count, len(universe)))
+        # Entries around today's stub price, so some holdings sit past their trigger
+        return [Holding(ticker=t, entry=round(stub_price(t) * rng.uniform(0.95, 1.15), 2),
+                        shares=rng.randint(1, 200)) for t in picks]
+
+    def history(count):
+        return [Trade(date=f'2026-{1 + i % 12:02d}-{1 + i % 28:02d}T16:05:00',
+                      date_string=f'2026-{1 + i % 12:02d}-{1 + i % 28:02d} 16:05:00',
+                      action='AUTONOMOUS TRADE',
+                      sold_ticker=rng.choice(universe), sold_price=100.0, sold_shares=10,
+                      bought_ticker=rng.choice(portfolio_tracker.BOT_ALTERNATIVES),
+                      bought_price=95.0, bought_shares=10,
+                      reason='synthetic', profit_loss=round(rng.uniform(-500, 500), 2))
+                for i in range(count)]
+
+    portfolios = {}
+    for key in ['ceri', 'assisted']:
+        portfolios[key] = Portfolio(name=key.title(), emoji='👤', initial=100000, start_date='2026-01-03',
+                                    strategy='Buy & hold', holdings=positions(holdings))
+    for key, threshold in BOT_THRESHOLDS.items():
+        log = history(trades)
+        portfolios[key] = Portfolio(name=f'{key.title()} Bot', emoji='🤖', initial=100000,
+                                    start_date='2026-01-03', sell_threshold=threshold,
+                                    strategy=f'Sell at {threshold}%', holdings=positions(holdings),
+                                    trades=log, wins=sum(t.profit_loss >= 0 for t in log),
+                                    losses=sum(t.profit_loss < 0 for t in log))
+    for i in range(extra + retired):
+        portfolios[f'synthetic{i:04d}'] = Portfolio(name=f'Synthetic {i}', emoji='🧪', initial=100000,
+                                                    start_date='2026-01-03', strategy='Synthetic',
+                                                    holdings=positions(holdings))
+
+    files = {f'{STATE_DIR}/{META_FILE}': dumps({'journalSeq': 0, 'lastSession': None})}
+    for order, (key, port) in enumerate(portfolios.items()):
+        definition = {'name': port.name, 'emoji': port.emoji, 'order': order,
+                      'active': order < 5 + extra}
+        if port.is_bot:
+            definition['sellThreshold'] = port.sell_threshold
+        else:
+            definition.update(startDate=port.start_date, holdings=[h.to_dict() for h in port.holdings])
+        files[f'{CONFIG_DIR}/{key}.json'] = dumps(definition)
+        files[f'{STATE_DIR}/{key}.json'] = dumps({'journalSeq': 0, 'portfolio': port.to_dict()})
+    return files
+
+def run_once(files):
+    """One full main() in a scratch directory; returns stage timings in ms"""
+    with tempfile.TemporaryDirectory() as scratch:
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        try:
+            for name, data in files.items():
+                Path(name).parent.mkdir(exist_ok=True)
+                Path(name).write_bytes(data)
+            with contextlib.redirect_stdout(io.StringIO()):
+                portfolio_tracker.main(['--refresh', '--snapshot', '--report', 'report.json'])
+                portfolios = portfolio_tracker.initialize_portfolios()
+            stages = {name: totals['wall'] * 1000
+                      for name, totals in json.loads(Path('report.json').read_text())['stages'].items()}
+
+            # Functions main() no longer calls directly, timed on the same state
+            prices = stub_fetch({h.ticker for p in portfolios.values() if p for h in p.holdings})
+            start = time.perf_counter()
+            for port in portfolios.values():
+                portfolio_tracker.calculate_portfolio_value(port, prices)
+            stages['calculate_portfolio_value'] = (time.perf_counter() - start) * 1000
+            # Cold dashboard write: shell, payload and every trade page
+            valuation = Valuation(portfolios, prices)
+            metrics = EquityMetrics()
+            start = time.perf_counter()
+            write_dashboard(portfolios, valuation, path='cold/index.html', data_dir='cold/data',
+                            metrics=metrics)
+            stages['write_dashboard'] = (time.perf_counter() - start) * 1000
+            return stages
+        finally:
+            os.chdir(cwd)
+
+def commit_id():
+    """Current commit (with -dirty if the tree has changes), for tagging results"""
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f'{rev}-dirty' if dirty else rev
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scale (best per stage is kept)')
+    parser.add_argument('--max-scale', type=int, default=len(SCALES), help='Only run the first N scales')
+    parser.add_argument('--retired', type=int, default=0, help='Inactive portfolios added to every scale')
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--compare', help='Earlier --json results to compare against')
+    args = parser.parse_args()
+
+    portfolio_tracker.fetch_current_prices = stub_fetch
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        baseline = {tuple(r['scale']): r['stages'] for r in previous['results']}
+        print(f"Comparing against {previous['commit']} ({args.compare})")
+
+    results = []
+    for scale in SCALES[:args.max_scale]:
+        extra, holdings, trades = scale
+        files = synthetic_state(extra, holdings, trades, args.retired)
+        state_bytes = sum(len(data) for name, data in files.items() if name.startswith(STATE_DIR))
+        best = {}
+        for _ in range(args.repeat if trades < 50000 else 1):
+            for name, ms in run_once(files).items():
+                best[name] = min(best.get(name, float('inf')), ms)
+
+        results.append({'scale': list(scale), 'portfolios': 5 + extra, 'retired': args.retired,
+                        'stateBytes': state_bytes, 'stages': best})
+        retired = f" + {args.retired} retired" if args.retired else ''
+        print(f"\n{5 + extra} portfolios{retired} × {holdings} holdings, {trades:,} trades/bot "
+              f"({state_bytes / 1024:,.0f} KB state)")
+        old = baseline.get(scale, {})
+        for name, ms in best.items():
+            delta = f"  {(ms / old[name] - 1) * 100:+6.1f}%" if old.get(name) else ''
+            print(f"  {name:<26} {ms:>10.2f} ms{delta}")
+
+    report = {
+        'commit': commit_id(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == '__main__':
+    main()
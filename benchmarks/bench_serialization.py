@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+⏱️ SERIALIZATION BENCHMARK
+Times loading and saving portfolio state with every installed JSON
+backend, at 1x, 100x and 10,000x the current trade history
+
+Usage: python benchmarks/bench_serialization.py [--repeat N]
+"""
+
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from portfolio_store import META_FILE, STATE_DIR
+from serializer import BACKENDS, dumps, decode_state, loads
+
+SCALES = [1, 100, 10000]
+
+def scaled_state(state, scale):
+    """Copy of the state with every bot's trade list repeated `scale` times"""
+    state = copy.deepcopy(state)
+    for port in state.values():
+        if isinstance(port, dict) and port.get('trades'):
+            port['trades'] = port['trades'] * scale
+    return state
+
+def default_data():
+    """The repo's state shards, or its snapshot if it hasn't been migrated yet"""
+    shards = ROOT / STATE_DIR
+    return shards if shards.is_dir() else ROOT / 'portfolio_data.json'
+
+def load_state(path):
+    """Portfolio state from a shard directory or an old single-file snapshot"""
+    path = Path(path)
+    if path.is_dir():
+        return {shard.stem: loads(shard.read_bytes())['portfolio']
+                for shard in sorted(path.glob('*.json')) if shard.name != META_FILE}
+    return decode_state(path.read_bytes())
+
+def best_of(repeat, fn):
+    """Fastest of `repeat` timings, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per case (best is kept)')
+    parser.add_argument('--data', default=str(default_data()),
+                        help='State shard directory (or an old portfolio_data.json)')
+    args = parser.parse_args()
+
+    base = load_state(args.data)
+    trades = sum(len(port.get('trades', [])) for port in base.values() if isinstance(port, dict))
+    print(f"Base state: {trades} trades • backends: {', '.join(BACKENDS)}\n")
+    print(f"{'scale':>7} {'trades':>9} {'backend':>8} {'mode':>8} {'size KB':>10} {'dump ms':>9} {'load ms':>9}")
+
+    for scale in SCALES:
+        state = scaled_state(base, scale)
+        repeat = args.repeat if scale < 10000 else 1
+        for backend in BACKENDS:
+            for compact in (False, True):
+                data = dumps(state, compact=compact, backend=backend)
+                dump_ms = best_of(repeat, lambda: dumps(state, compact=compact, backend=backend))
+                load_ms = best_of(repeat, lambda: decode_state(data, backend=backend))
+                print(f"{scale:>6}x {trades * scale:>9,} {backend:>8} {'compact' if compact else 'indent':>8} "
+                      f"{len(data) / 1024:>10,.0f} {dump_ms:>9.1f} {load_ms:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+⏱️ CLI COLD-START BENCHMARK
+Times fresh `python portfolio_tracker.py <command>` processes for the
+commands that never touch the network, and checks that none of them
+imports the heavy fetch dependencies (yfinance, pandas, requests).
+Runs in a scratch directory against a copy of the state and a price
+cache filled with deterministic prices.
+
+Usage: python benchmarks/bench_startup.py [--repeat N] [--json out.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_pipeline import commit_id, stub_fetch
+from bench_serialization import default_data
+from portfolio_store import CONFIG_DIR, STATE_DIR
+from price_cache import PriceCache
+
+SCRIPT = ROOT / 'portfolio_tracker.py'
+
+# Offline commands whose start-up cost is tracked
+COMMANDS = [
+    ['--help'],
+    ['report'],
+    ['render'],
+    ['fetch', '--offline'],
+    ['trade', '--offline'],
+]
+
+HEAVY_MODULES = ['yfinance', 'pandas', 'requests']
+
+def prepare(scratch, data):
+    """Config and state plus a warm price cache, so every command can run offline"""
+    shutil.copytree(ROOT / CONFIG_DIR, Path(scratch) / CONFIG_DIR)
+    if Path(data).is_dir():
+        shutil.copytree(data, Path(scratch) / STATE_DIR)
+    else:
+        shutil.copy(data, Path(scratch) / 'portfolio_data.json')
+    import portfolio_tracker
+    cwd = os.getcwd()
+    os.chdir(scratch)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            portfolios, _ = portfolio_tracker.load_state()
+        cache = PriceCache()
+        cache.store(stub_fetch(portfolio_tracker.collect_tickers(portfolios)))
+        cache.close()
+    finally:
+        os.chdir(cwd)
+
+def _timed(command, scratch):
+    start = time.perf_counter()
+    subprocess.run(command, cwd=scratch, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+def run_command(args, scratch):
+    """Wall time of one cold process, and the heavy modules it imported"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', str(SCRIPT), *args],
+                            cwd=scratch, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr[-2000:]}")
+    imported = {m.group(1).split('.')[0] for m in re.finditer(r'\|\s+([\w.]+)$', result.stderr, re.M)}
+    return elapsed, sorted(imported & set(HEAVY_MODULES))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Processes per command (best is kept)')
+    parser.add_argument('--data', default=str(default_data()),
+                        help='State shard directory (or an old portfolio_data.json)')
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        prepare(scratch, args.data)
+        interpreter = min(_timed([sys.executable, '-c', 'pass'], scratch) for _ in range(args.repeat))
+        print(f"Bare interpreter start: {interpreter * 1000:.1f} ms\n")
+        print(f"{'command':<20} {'best ms':>9} {'heavy imports'}")
+        for command in COMMANDS:
+            best, heavy = float('inf'), []
+            for _ in range(args.repeat):
+                elapsed, heavy = run_command(command, scratch)
+                best = min(best, elapsed)
+            results.append({'command': ' '.join(command), 'ms': best * 1000, 'heavyImports': heavy})
+            print(f"{' '.join(command):<20} {best * 1000:>9.1f} {', '.join(heavy) or '-'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'commit': commit_id(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': platform.python_version(), 'platform': platform.platform(),
+                       'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+// 🎨 Client-side dashboard renderer
+// index.html is a static shell; every run only rewrites dashboard_data/dashboard.json
+// (plus the newest trade history page), which this script turns into the page.
+
+const DATA_DIR = 'dashboard_data';
+const DATA_VERSION = 1;
+const CHART_WIDTH = 300;
+const CHART_HEIGHT = 80;
+
+function esc(value) {
+    return String(value ?? '').replace(/[&<>"']/g, c => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    }[c]));
+}
+
+function statRow(label, value) {
+    return `<div class="stat-row"><span>${label}:</span><span><strong>${esc(value)}</strong></span></div>`;
+}
+
+function renderTrade(trade) {
+    const pl = trade.profitLoss;
+    return `
+        <div class="trade-entry">
+            <div style="color: #6c757d; font-size: 0.85em;">${esc(trade.dateString)}</div>
+            <div style="margin-top: 5px;"><strong>SOLD:</strong> ${esc(trade.soldTicker)} (${esc(trade.soldShares)} @ $${esc(trade.soldPrice)})</div>
+            <div><strong>BOUGHT:</strong> ${esc(trade.boughtTicker)} (${esc(trade.boughtShares)} @ $${esc(trade.boughtPrice)})</div>
+            <div style="margin-top: 5px; color: #6c757d;">${esc(trade.reason)}</div>
+            <div class="${pl >= 0 ? 'positive' : 'negative'}" style="margin-top: 5px;">
+                P/L: ${pl >= 0 ? '+' : ''}$${esc(pl)}
+            </div>
+        </div>`;
+}
+
+function renderChart(points) {
+    // Points arrive already downsampled to the chart budget: [day, value] pairs
+    if (points.length < 2) {
+        return '';
+    }
+    const days = points.map(([day]) => Date.parse(day));
+    const values = points.map(([, value]) => value);
+    const low = Math.min(...values), high = Math.max(...values);
+    const xSpan = (days[days.length - 1] - days[0]) || 1;
+    const ySpan = (high - low) || 1;
+    const coords = days.map((day, i) =>
+        `${((day - days[0]) / xSpan * CHART_WIDTH).toFixed(1)},${((high - values[i]) / ySpan * CHART_HEIGHT).toFixed(1)}`);
+    return `<svg class="equity-chart" viewBox="0 0 ${CHART_WIDTH} ${CHART_HEIGHT}" preserveAspectRatio="none"><polyline points="${coords.join(' ')}"/></svg>`;
+}
+
+function renderCard(key, view) {
+    let stats, trades = '';
+    if (view.bot) {
+        const winRate = view.totalTrades > 0 ? view.wins / view.totalTrades * 100 : 0;
+        stats = statRow('Win Rate', `${winRate.toFixed(0)}% (${view.wins}/${view.totalTrades})`)
+              + statRow('Total Trades', view.totalTrades)
+              + statRow('Strategy', view.strategy);
+        if (view.recentTrades.length) {
+            const more = view.tradePages > 0
+                ? `<button class="load-trades" data-key="${esc(key)}" data-page="${view.tradePages - 1}">Load full history</button>`
+                : '';
+            trades = `<div class="trade-log" id="trades-${esc(key)}">
+                <div style="font-weight: bold; margin-bottom: 10px;">Recent Trades:</div>
+                <div class="trade-list">${view.recentTrades.map(renderTrade).join('')}</div>${more}</div>`;
+        } else {
+            trades = '<div class="trade-log" style="text-align: center; color: #6c757d; padding: 20px;">No trades yet • Bot monitoring markets daily</div>';
+        }
+    } else {
+        stats = statRow('Started', view.startDate)
+              + statRow('Holdings', `${view.holdings} stocks`)
+              + statRow('Strategy', view.strategy);
+    }
+    let risk = '';
+    if (view.risk) {
+        risk = `<div class="bot-stats">${statRow('Drawdown', view.risk.drawdown)}${statRow('Volatility (ann.)', view.risk.volatility)}${statRow('Sharpe', view.risk.sharpe)}${statRow('Returns', view.risk.returns)}</div>`;
+    }
+    return `
+        <div class="bot-card ${view.winning ? 'winning' : ''}">
+            <div class="bot-header"><div class="bot-title">${esc(view.emoji)} ${esc(view.name)}</div></div>
+            <div class="bot-value">${esc(view.value)}</div>
+            <div style="font-size: 1.3em; font-weight: bold; margin-bottom: 15px;" class="${view.positive ? 'positive' : 'negative'}">
+                ${esc(view.change)}
+            </div>
+            ${renderChart(view.chart || [])}
+            <div class="bot-stats">${stats}</div>${risk}
+            ${trades}
+        </div>`;
+}
+
+function renderLeader(key, view, idx) {
+    return `
+        <div class="leader-row ${idx === 0 ? 'first' : ''}">
+            <div style="display: flex; align-items: center; gap: 15px;">
+                <div class="rank">${idx + 1}.</div>
+                <div>${esc(view.emoji)} ${esc(view.name)} ${idx === 0 ? '🏆' : ''}</div>
+            </div>
+            <div style="text-align: right;">
+                <div style="font-size: 1.5em; font-weight: bold;">${esc(view.value)}</div>
+                <div class="${view.positive ? 'positive' : 'negative'}" style="font-size: 1.1em;">${esc(view.change)}</div>
+            </div>
+        </div>`;
+}
+
+async function loadTrades(button) {
+    // Pages hold trades oldest first; walk backwards from the newest one
+    const key = button.dataset.key;
+    const page = Number(button.dataset.page);
+    button.disabled = true;
+    // Full pages never change; the size in the URL busts the cache of the growing last one
+    const perPage = window.dashboard.tradesPerPage;
+    const size = Math.min(perPage, window.dashboard.cards[key].tradeCount - page * perPage);
+    const response = await fetch(`${DATA_DIR}/trades/${key}/${page}.json?v=${size}`);
+    const trades = await response.json();
+    const list = document.querySelector(`#trades-${key} .trade-list`);
+    if (button.dataset.loaded !== 'true') {
+        list.innerHTML = '';  // Replace the recent-trades preview with the full history
+        button.dataset.loaded = 'true';
+    }
+    list.insertAdjacentHTML('beforeend', trades.slice().reverse().map(renderTrade).join(''));
+    if (page > 0) {
+        button.dataset.page = page - 1;
+        button.textContent = 'Load older trades';
+        button.disabled = false;
+    } else {
+        button.remove();
+    }
+}
+
+async function main() {
+    const response = await fetch(`${DATA_DIR}/dashboard.json`, { cache: 'no-cache' });
+    const data = await response.json();
+    if (data.version !== DATA_VERSION) {
+        throw new Error(`Unsupported dashboard data version ${data.version}`);
+    }
+    window.dashboard = data;
+
+    document.getElementById('title').textContent = `🏆 ${data.standings.length}-WAY PORTFOLIO COMPETITION`;
+    document.getElementById('updated').textContent = `📊 Last Updated: ${data.updated}`;
+    document.getElementById('standings').innerHTML =
+        data.standings.map((key, idx) => renderLeader(key, data.cards[key], idx)).join('');
+    document.getElementById('cards').innerHTML =
+        data.cardOrder.map(key => renderCard(key, data.cards[key])).join('');
+    document.querySelectorAll('.load-trades').forEach(button =>
+        button.addEventListener('click', () => loadTrades(button)));
+}
+
+main().catch(error => {
+    document.getElementById('cards').innerHTML =
+        `<div class="trade-log" style="text-align: center;">Could not load dashboard data: ${esc(error.message)}</div>`;
+});
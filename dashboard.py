@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+🎨 DASHBOARD RENDERER
+index.html is a static shell (with dashboard.css and dashboard.js as
+long-cacheable assets) that is only rewritten when the assets change.
+Each run writes a small compact JSON payload with the standings and
+cards, which the page renders client-side, and the bots' trade history
+as fixed-size pages that are loaded on demand. Full pages never change,
+so a run only touches the newest one.
+"""
+
+import datetime
+import hashlib
+import json
+from pathlib import Path
+
+from journal import atomic_write
+from metrics import ROLLING_WINDOWS
+
+# Output files
+DASHBOARD_FILE = 'index.html'
+STYLESHEET_FILE = 'dashboard.css'
+SCRIPT_FILE = 'dashboard.js'
+DATA_DIR = 'dashboard_data'
+DATA_FILE = 'dashboard.json'
+
+# Payload format understood by dashboard.js
+DATA_VERSION = 1
+
+# Trades per history page file
+TRADES_PER_PAGE = 50
+
+def _asset_version(path=STYLESHEET_FILE):
+    """Content hash used to bust browser caches when a static asset changes"""
+    asset_path = Path(__file__).resolve().parent / path
+    if not asset_path.exists():
+        return '0'
+    return hashlib.sha1(asset_path.read_bytes()).hexdigest()[:10]
+
+def _pct(ratio):
+    return '—' if ratio is None else f"{ratio * 100:+.2f}%"
+
+def _risk_view(summary):
+    """Stored risk metrics formatted for a card"""
+    if not summary:
+        return None
+    returns = summary['returns']
+    return {
+        'drawdown': f"{_pct(summary['drawdown'])} (max {_pct(summary['maxDrawdown'])})",
+        'volatility': '—' if summary['volatility'] is None else f"{summary['volatility'] * 100:.1f}%",
+        'sharpe': '—' if summary['sharpe'] is None else f"{summary['sharpe']:.2f}",
+        'returns': ' / '.join(f"{label} {_pct(returns.get(label))}" for label in ROLLING_WINDOWS),
+    }
+
+def _card_view(key, port, valuation, is_winning, summary=None, chart=None):
+    """Everything a portfolio card displays, as plain data"""
+    change, change_pct = valuation.pnl(key)
+    view = {
+        'emoji': port.emoji,
+        'name': port.name,
+        'value': f"${valuation.value(key):,.0f}",
+        'positive': change >= 0,
+        'change': f"{'+' if change >= 0 else ''}${change:,.0f} ({change_pct:+.2f}%)",
+        'winning': is_winning,
+        'strategy': port.strategy,
+        'bot': port.is_bot,
+        'risk': _risk_view(summary),
+        'chart': chart or [],
+    }
+    if view['bot']:
+        view['totalTrades'] = sum(1 for t in port.trades or [] if t.action == 'AUTONOMOUS TRADE')
+        view['wins'] = port.wins
+        view['recentTrades'] = [t.to_dict() for t in (port.trades or [])[-5:][::-1]]
+    else:
+        view['startDate'] = port.start_date
+        view['holdings'] = len(port.holdings)
+    return view
+
+def render_shell():
+    """Static page that loads the data payload and renders it with dashboard.js"""
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>🏆 Portfolio Competition - Live Dashboard</title>
+    <link rel="stylesheet" href="{STYLESHEET_FILE}?v={_asset_version(STYLESHEET_FILE)}">
+    <script src="{SCRIPT_FILE}?v={_asset_version(SCRIPT_FILE)}" defer></script>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1 id="title">🏆 PORTFOLIO COMPETITION</h1>
+            <div class="subtitle">Autonomous AI Trading Lab • Real Market Data</div>
+            <div class="auto-badge">🤖 FULLY AUTONOMOUS</div>
+            <div class="update-badge" id="updated">📊 Loading latest standings...</div>
+            <p style="margin-top: 15px; font-size: 0.9em;">Updates automatically daily at 4:05 PM EST</p>
+        </div>
+
+        <div class="leaderboard">
+            <h2>🏆 CURRENT STANDINGS</h2>
+            <div id="standings"></div>
+            <noscript><p style="text-align: center;">Enable JavaScript to see the standings.</p></noscript>
+        </div>
+
+        <div class="bot-grid" id="cards"></div>
+
+        <div class="footer">
+            <p><strong>🤖 Fully Autonomous Trading Lab</strong></p>
+            <p style="margin-top: 10px;">Updates automatically daily at 4:05 PM EST via GitHub Actions</p>
+            <p style="margin-top: 5px; font-size: 0.9em;">Competition started January 2026 • Ends January 2027</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+def _compact_json(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+
+def _write_if_changed(path, data):
+    """Atomically replace a file only when its contents differ; returns whether it was written"""
+    path = Path(path)
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(path, data)
+    return True
+
+def dashboard_data(portfolios, valuation, metrics=None):
+    """The per-run payload: standings plus every card's view"""
+    standings = valuation.standings()
+    cards = {}
+    for key in standings:
+        port = portfolios[key]
+        summary = metrics.summary(key) if metrics else None
+        chart = metrics.chart(key) if metrics else None
+        view = _card_view(key, port, valuation, key == standings[0], summary, chart)
+        if view['bot']:
+            view['tradeCount'] = len(port.trades or [])
+            view['tradePages'] = -(-view['tradeCount'] // TRADES_PER_PAGE)
+        cards[key] = view
+
+    return {
+        'version': DATA_VERSION,
+        'updated': datetime.datetime.now().strftime('%B %d, %Y at %I:%M %p EST'),
+        'standings': standings,
+        'cardOrder': [key for key in portfolios if key in cards],
+        'cards': cards,
+        'tradesPerPage': TRADES_PER_PAGE,
+    }
+
+def write_trade_pages(portfolios, data_dir=DATA_DIR):
+    """Write each bot's trade history as pages of TRADES_PER_PAGE; returns pages written
+
+    Trades are only ever appended, so pages before the last one on disk
+    were full when written and are left alone. Everything from that page
+    on is rewritten, since it may have been partial.
+    """
+    written = 0
+    for key, port in portfolios.items():
+        if not (port and port.is_bot):
+            continue
+        trades = port.trades or []
+        pages = -(-len(trades) // TRADES_PER_PAGE)
+        bot_dir = Path(data_dir) / 'trades' / key
+        stored = [int(p.stem) for p in bot_dir.glob('*.json') if p.stem.isdigit()]
+        for page in range(min(max(stored, default=0), pages), pages):
+            chunk = trades[page * TRADES_PER_PAGE:(page + 1) * TRADES_PER_PAGE]
+            written += _write_if_changed(bot_dir / f'{page}.json', _compact_json([t.to_dict() for t in chunk]))
+    return written
+
+def write_dashboard(portfolios, valuation, path=DASHBOARD_FILE, data_dir=DATA_DIR, metrics=None):
+    """Write the run's data payload and trade pages (and the shell if it changed)
+
+    Returns what was written: {'shell': bool, 'dataBytes': int, 'pages': int}.
+    """
+    shell = _write_if_changed(path, render_shell().encode())
+    data = _compact_json(dashboard_data(portfolios, valuation, metrics))
+    _write_if_changed(Path(data_dir) / DATA_FILE, data)
+    pages = write_trade_pages(portfolios, data_dir)
+    return {'shell': shell, 'dataBytes': len(data), 'pages': pages}
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+⏱️ RUN INSTRUMENTATION
+Lightweight counters for one run of the tracker: wall and CPU time per
+stage, fetch request latencies (with a histogram, plus the slowest
+request behind each ticker) and bytes read and
+written per file. Everything is collected on a module-level recorder
+and written out as a JSON run report at the end of main().
+"""
+
+import bisect
+import datetime
+import time
+from contextlib import contextmanager
+
+from serializer import dumps
+
+# Machine-readable report of the last run
+RUN_REPORT_FILE = 'run_report.json'
+
+# Upper bounds (seconds) of the fetch latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+def _percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class Instrumentation:
+    """Timers and counters for a single run"""
+
+    def __init__(self):
+        self.started_at = datetime.datetime.now()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.stages = {}
+        self.requests = []   # One latency per upstream request
+        self.latencies = {}  # ticker -> latencies of the requests that carried it
+        self.io = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block, adding to the stage's totals if it runs more than once"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+            totals['wall'] += time.perf_counter() - wall
+            totals['cpu'] += time.process_time() - cpu
+            totals['calls'] += 1
+
+    def record_fetch(self, tickers, seconds):
+        """Latency of one request, and of it for each ticker it asked for"""
+        self.requests.append(seconds)
+        for ticker in tickers:
+            self.latencies.setdefault(ticker, []).append(seconds)
+
+    def record_io(self, direction, size, path):
+        """Bytes read or written for a file"""
+        counts = self.io.setdefault(str(path), {'read': 0, 'written': 0})
+        counts[direction] += size
+
+    def report(self):
+        """Everything recorded so far, as plain data"""
+        latencies = sorted(self.requests)
+        histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        for seconds in latencies:
+            histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+        return {
+            'startedAt': self.started_at.isoformat(),
+            'wall': time.perf_counter() - self.wall_start,
+            'cpu': time.process_time() - self.cpu_start,
+            'stages': self.stages,
+            'fetch': {
+                'requests': len(latencies),
+                'p50': _percentile(latencies, 0.5),
+                'p95': _percentile(latencies, 0.95),
+                'max': latencies[-1] if latencies else None,
+                'buckets': LATENCY_BUCKETS + ['inf'],
+                'histogram': histogram,
+                'tickers': {ticker: max(samples) for ticker, samples in sorted(self.latencies.items())},
+            },
+            'io': {
+                'read': sum(c['read'] for c in self.io.values()),
+                'written': sum(c['written'] for c in self.io.values()),
+                'files': self.io,
+            },
+        }
+
+    def write_report(self, path=RUN_REPORT_FILE):
+        report = self.report()
+        with open(path, 'wb') as f:
+            f.write(dumps(report))
+        return report
+
+# Recorder for the current run
+RUN = Instrumentation()
+
+def reset():
+    """Start a fresh recorder (one per run)"""
+    global RUN
+    RUN = Instrumentation()
+    return RUN
+
+def stage(name):
+    return RUN.stage(name)
+
+def record_fetch(tickers, seconds):
+    RUN.record_fetch(tickers, seconds)
+
+def record_io(direction, size, path):
+    RUN.record_io(direction, size, path)
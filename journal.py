@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+📜 APPEND-ONLY TRADE JOURNAL
+Trades and portfolio changes are appended to a JSON Lines journal
+instead of rewriting state files on every run. Every SNAPSHOT_EVERY
+entries the portfolios that changed are compacted into their state
+shards (replaced atomically); loading replays the journal tail on top
+of the shards.
+"""
+
+import os
+
+from instrumentation import record_io
+from models import Holding, Trade, Portfolio
+from serializer import dumps, loads, DECODE_ERRORS
+
+# Journal file (one JSON event per line)
+JOURNAL_FILE = 'portfolio_journal.jsonl'
+
+# Journal entries allowed to pile up before the snapshot is rewritten
+SNAPSHOT_EVERY = 50
+
+def atomic_write(path, data):
+    """Write bytes to a file so readers see either the old or the new contents, never half"""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        record_io('written', len(data), path)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class Journal:
+    """Sequenced JSON Lines log of state changes"""
+
+    def __init__(self, path=JOURNAL_FILE, read_only=False):
+        self.path = path
+        self.read_only = read_only  # Replay only: never append or rewrite the file
+        self.snapshot_seq = 0  # Last entry already folded into the snapshot
+        self.seq = 0           # Last entry written
+        self.last_session = None  # Last trading session the bots were run for
+        self.dirty = set()        # Portfolios changed since the last snapshot
+        self.damaged = False
+
+    def entries(self, after=0):
+        """Journal entries with seq > after, in order"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            for line in f:
+                record_io('read', len(line), self.path)
+                try:
+                    entry = loads(line)
+                except DECODE_ERRORS:
+                    # A crash mid-append can only damage the final line
+                    self.damaged = True
+                    break
+                if entry['seq'] > after:
+                    yield entry
+
+    def replay(self, portfolios, snapshot_seq=0, applied=None):
+        """Apply every entry newer than the snapshot; returns how many were applied
+
+        applied maps portfolio keys to the seq their state already
+        includes (a shard written after the snapshot); older entries for
+        them are skipped.
+        """
+        applied = applied or {}
+        self.snapshot_seq = self.seq = snapshot_seq
+        count = 0
+        for entry in self.entries(after=snapshot_seq):
+            self.seq = entry['seq']
+            if entry['type'] == 'session':
+                self.last_session = entry['session']
+            elif entry['seq'] > applied.get(entry['key'], 0):
+                apply_entry(portfolios, entry)
+                self.dirty.add(entry['key'])
+            else:
+                continue
+            count += 1
+
+        # Rewrite without the torn line so new entries don't get glued onto it
+        if self.damaged and self.read_only:
+            print(f"⚠️  Ignoring truncated journal entry in {self.path}")
+        elif self.damaged:
+            print(f"⚠️  Dropping truncated journal entry in {self.path}")
+            self.compact(snapshot_seq)
+            self.damaged = False
+        return count
+
+    @property
+    def pending(self):
+        """Entries written since the last snapshot"""
+        return self.seq - self.snapshot_seq
+
+    def append(self, entry):
+        if self.read_only:
+            raise RuntimeError(f"{self.path} was opened read-only")
+        self.seq += 1
+        entry = {'seq': self.seq, **entry}
+        line = dumps(entry, compact=True) + b'\n'
+        with open(self.path, 'ab') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        record_io('written', len(line), self.path)
+        if 'key' in entry:
+            self.dirty.add(entry['key'])
+        return entry
+
+    def record_portfolio(self, key, portfolio):
+        """Log a whole portfolio being (re)created"""
+        return self.append({'type': 'portfolio', 'key': key, 'portfolio': portfolio.to_dict()})
+
+    def record_trade(self, key, index, trade, holding):
+        """Log a trade that replaced holdings[index] with `holding`"""
+        return self.append({'type': 'trade', 'key': key, 'index': index,
+                            'trade': trade.to_dict(), 'holding': holding.to_dict()})
+
+    def record_session(self, session):
+        """Log that the bots have been run for a trading session"""
+        self.last_session = session.isoformat()
+        return self.append({'type': 'session', 'session': self.last_session})
+
+    def compact(self, snapshot_seq):
+        """Drop entries folded into a snapshot written at snapshot_seq"""
+        tail = b''.join(dumps(entry, compact=True) + b'\n'
+                        for entry in self.entries(after=snapshot_seq))
+        atomic_write(self.path, tail)
+        self.snapshot_seq = snapshot_seq
+
+class MemoryJournal(Journal):
+    """Journal kept in memory only, for dry runs that must not touch saved state"""
+
+    def __init__(self):
+        super().__init__(path=None)
+        self.log = []
+
+    def entries(self, after=0):
+        return (entry for entry in self.log if entry['seq'] > after)
+
+    def append(self, entry):
+        self.seq += 1
+        entry = {'seq': self.seq, **entry}
+        self.log.append(entry)
+        if 'key' in entry:
+            self.dirty.add(entry['key'])
+        return entry
+
+def apply_entry(portfolios, entry):
+    """Re-apply one journal entry to in-memory state"""
+    if entry['type'] == 'portfolio':
+        portfolios[entry['key']] = Portfolio.from_dict(entry['portfolio'])
+    elif entry['type'] == 'trade':
+        bot = portfolios[entry['key']]
+        trade = Trade.from_dict(entry['trade'])
+        bot.trades.append(trade)
+        bot.holdings[entry['index']] = Holding.from_dict(entry['holding'])
+        if trade.profit_loss >= 0:
+            bot.wins += 1
+        else:
+            bot.losses += 1
+    else:
+        raise ValueError(f"Unknown journal entry type: {entry['type']}")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+📅 NYSE TRADING CALENDAR
+Works out trading sessions (weekends + exchange holidays) without
+pulling in a calendar dependency
+"""
+
+import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_OPEN = datetime.time(9, 30)
+MARKET_CLOSE = datetime.time(16, 0)
+
+def _observed(day):
+    """Shift a fixed-date holiday that falls on a weekend to the nearest weekday"""
+    if day.weekday() == 5:
+        return day - datetime.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + datetime.timedelta(days=1)
+    return day
+
+def _nth_weekday(year, month, weekday, n):
+    """Date of the nth given weekday in a month (n=-1 for the last one)"""
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + datetime.timedelta(days=offset + 7 * (n - 1))
+
+    next_month = datetime.date(year + month // 12, month % 12 + 1, 1)
+    last = next_month - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+def _easter(year):
+    """Western Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year):
+    """Full-day NYSE closures for a year"""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),                      # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                      # Presidents' Day
+        _easter(year) - datetime.timedelta(days=2),       # Good Friday
+        _nth_weekday(year, 5, 0, -1),                     # Memorial Day
+        _observed(datetime.date(year, 7, 4)),             # Independence Day
+        _nth_weekday(year, 9, 0, 1),                      # Labor Day
+        _nth_weekday(year, 11, 3, 4),                     # Thanksgiving
+        _observed(datetime.date(year, 12, 25)),           # Christmas
+    }
+
+    # New Year's Day on a Saturday is not observed on the Friday before
+    new_year = datetime.date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+
+    if year >= 2022:
+        holidays.add(_observed(datetime.date(year, 6, 19)))  # Juneteenth
+
+    return frozenset(holidays)
+
+def is_trading_day(day):
+    """Check whether the exchange is open on a date"""
+    return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+def previous_trading_day(day):
+    """Last trading day strictly before a date"""
+    day -= datetime.timedelta(days=1)
+    while not is_trading_day(day):
+        day -= datetime.timedelta(days=1)
+    return day
+
+def sessions_between(after, before):
+    """Trading days strictly between two dates, oldest first"""
+    day = after + datetime.timedelta(days=1)
+    sessions = []
+    while day < before:
+        if is_trading_day(day):
+            sessions.append(day)
+        day += datetime.timedelta(days=1)
+    return sessions
+
+def market_now(now=None):
+    """Current time in the exchange's timezone"""
+    if now is None:
+        return datetime.datetime.now(MARKET_TZ)
+    if now.tzinfo is None:
+        now = now.astimezone()
+    return now.astimezone(MARKET_TZ)
+
+def current_session(now=None):
+    """Session that the latest quote belongs to (today once the bell rings)"""
+    now = market_now(now)
+    today = now.date()
+    if is_trading_day(today) and now.time() >= MARKET_OPEN:
+        return today
+    return previous_trading_day(today)
+
+def session_close(day):
+    """Closing bell of a session as an aware datetime"""
+    return datetime.datetime.combine(day, MARKET_CLOSE, tzinfo=MARKET_TZ)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+📈 EQUITY CURVES AND RISK METRICS
+Keeps a daily equity curve per portfolio plus running statistics of its
+daily returns (Welford mean/variance, peak and drawdown), updated with
+one new point per session instead of recomputing the whole history.
+Volatility, Sharpe, drawdown and rolling returns are stored ready to
+render in one file per portfolio under state/metrics/, along with weekly
+and monthly rollups of the curve for the dashboard charts. A run only
+reads and rewrites the files of the portfolios it values.
+"""
+
+import math
+import os
+from pathlib import Path
+
+from instrumentation import record_io
+from journal import atomic_write
+from portfolio_store import STATE_DIR
+from serializer import dumps, loads
+from timeseries import CHART_POINTS, RESOLUTIONS, build_rollups, chart_points, roll_up
+
+# One <key>.json metrics file per portfolio, next to the state shards
+METRICS_DIR = os.path.join(STATE_DIR, 'metrics')
+
+# Single file used before metrics were split per portfolio
+LEGACY_METRICS_FILE = 'portfolio_metrics.json'
+
+# Trading sessions per year, for annualizing
+SESSIONS_PER_YEAR = 252
+
+# Annual risk-free rate used in the Sharpe ratio
+RISK_FREE_RATE = 0.0
+
+# Rolling return windows, in sessions
+ROLLING_WINDOWS = {'1W': 5, '1M': 21, '3M': 63}
+
+def _empty_stats():
+    return {'count': 0, 'mean': 0.0, 'm2': 0.0, 'peak': 0.0, 'maxDrawdown': 0.0}
+
+def _add_point(stats, previous, value):
+    """Fold one session's value into the running statistics"""
+    if previous:
+        # Welford's online update of the daily return mean and variance
+        ret = value / previous - 1
+        stats['count'] += 1
+        delta = ret - stats['mean']
+        stats['mean'] += delta / stats['count']
+        stats['m2'] += delta * (ret - stats['mean'])
+    stats['peak'] = max(stats['peak'], value)
+    if stats['peak']:
+        stats['maxDrawdown'] = min(stats['maxDrawdown'], value / stats['peak'] - 1)
+
+def _summary(stats, curve):
+    """Display-ready metrics from the running statistics and the curve tail"""
+    value = curve[-1][1]
+    summary = {
+        'value': value,
+        'drawdown': value / stats['peak'] - 1 if stats['peak'] else 0.0,
+        'maxDrawdown': stats['maxDrawdown'],
+        'volatility': None,
+        'sharpe': None,
+        'returns': {},
+    }
+    if stats['count'] > 1:
+        daily_std = math.sqrt(stats['m2'] / (stats['count'] - 1))
+        summary['volatility'] = daily_std * math.sqrt(SESSIONS_PER_YEAR)
+        if daily_std > 0:
+            excess = stats['mean'] - RISK_FREE_RATE / SESSIONS_PER_YEAR
+            summary['sharpe'] = excess / daily_std * math.sqrt(SESSIONS_PER_YEAR)
+    for label, window in ROLLING_WINDOWS.items():
+        if len(curve) > window and curve[-1 - window][1]:
+            summary['returns'][label] = value / curve[-1 - window][1] - 1
+    return summary
+
+def _read(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    record_io('read', len(data), path)
+    return loads(data)
+
+def _with_rollups(series):
+    # Files written before rollups existed get them built once
+    if 'rollups' not in series:
+        series['rollups'] = build_rollups(series['curve'])
+    return series
+
+class EquityMetrics:
+    """Per-portfolio equity curves and incrementally maintained risk statistics"""
+
+    def __init__(self, path=METRICS_DIR, legacy_path=LEGACY_METRICS_FILE):
+        self.path = Path(path)
+        self.series = {}   # Loaded on first use; None for portfolios without metrics
+        self.dirty = set()
+        self.legacy_path = None
+        # The old single file is read whole once, then split up by save()
+        if legacy_path and os.path.exists(legacy_path):
+            self.series = {key: _with_rollups(series) for key, series in _read(legacy_path).items()}
+            self.dirty = set(self.series)
+            self.legacy_path = legacy_path
+
+    def _series(self, key):
+        if key not in self.series:
+            path = self.path / f'{key}.json'
+            self.series[key] = _with_rollups(_read(path)) if path.exists() else None
+        return self.series[key]
+
+    def update(self, session, values):
+        """Add today's value for each portfolio (a rerun of the same session replaces it)"""
+        day = session.isoformat()
+        for key, value in values.items():
+            series = self._series(key)
+            if series is None:
+                series = self.series[key] = {'curve': [], 'stats': _empty_stats(),
+                                             'rollups': build_rollups([])}
+            curve = series['curve']
+            if curve and curve[-1][0] > day:
+                continue
+            if curve and curve[-1][0] == day:
+                # Undo the earlier run's point by going back to the stats before it
+                curve.pop()
+                series['stats'] = series['base']
+
+            series['base'] = dict(series['stats'])
+            value = round(float(value), 2)
+            _add_point(series['stats'], curve[-1][1] if curve else None, value)
+            curve.append([day, value])
+            for resolution in RESOLUTIONS:
+                roll_up(series['rollups'][resolution], day, value, resolution)
+            series['summary'] = _summary(series['stats'], curve)
+            self.dirty.add(key)
+
+    def summary(self, key):
+        series = self._series(key)
+        return series and series.get('summary')
+
+    def curve(self, key):
+        series = self._series(key)
+        return series['curve'] if series else []
+
+    def chart(self, key, budget=CHART_POINTS):
+        """The equity curve downsampled to at most `budget` points"""
+        series = self._series(key)
+        return chart_points(series['curve'], series['rollups'], budget) if series else []
+
+    def save(self):
+        """Rewrite the files of the portfolios updated since loading"""
+        if self.dirty:
+            self.path.mkdir(parents=True, exist_ok=True)
+        for key in sorted(self.dirty):
+            atomic_write(self.path / f'{key}.json', dumps(self.series[key], compact=True))
+        self.dirty.clear()
+        if self.legacy_path:
+            os.remove(self.legacy_path)
+            print(f"📦 Split {self.legacy_path} into per-portfolio files in {self.path}/")
+            self.legacy_path = None
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+🧱 PORTFOLIO RECORD TYPES
+Slotted Holding / Trade / Portfolio classes that round-trip losslessly
+to the portfolio_data.json schema. Slots keep per-record memory small
+(trade history grows all competition long) and make attribute access
+in the trading and rendering loops cheaper than string-keyed dicts.
+"""
+
+class Record:
+    """Base for slotted records mapped to JSON objects
+
+    FIELDS pairs each attribute with its JSON key. Fields absent from the
+    JSON are None and are left out again on the way back; any keys the
+    class doesn't know (or explicit nulls) are kept verbatim in `extra`.
+    """
+
+    __slots__ = ('extra',)
+    FIELDS = ()
+
+    def __init__(self, extra=None, **values):
+        for attr, _ in self.FIELDS:
+            setattr(self, attr, values.pop(attr, None))
+        if values:
+            raise TypeError(f"{type(self).__name__} got unexpected fields: {', '.join(values)}")
+        self.extra = extra or {}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        values = {}
+        for attr, key in cls.FIELDS:
+            if data.get(key) is not None:
+                values[attr] = cls._decode(attr, data.pop(key))
+        return cls(extra=data, **values)
+
+    @classmethod
+    def _decode(cls, attr, value):
+        return value
+
+    def to_dict(self):
+        data = {}
+        for attr, key in self.FIELDS:
+            value = getattr(self, attr)
+            if value is not None:
+                data[key] = self._encode(attr, value)
+        data.update(self.extra)
+        return data
+
+    def _encode(self, attr, value):
+        return value
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ', '.join(f'{attr}={getattr(self, attr)!r}' for attr, _ in self.FIELDS
+                           if getattr(self, attr) is not None)
+        return f'{type(self).__name__}({fields})'
+
+class Holding(Record):
+    __slots__ = ('ticker', 'entry', 'shares')
+    FIELDS = (('ticker', 'ticker'), ('entry', 'entry'), ('shares', 'shares'))
+
+class Trade(Record):
+    __slots__ = ('date', 'date_string', 'action', 'sold_ticker', 'sold_price', 'sold_shares',
+                 'bought_ticker', 'bought_price', 'bought_shares', 'reason', 'profit_loss')
+    FIELDS = (
+        ('date', 'date'),
+        ('date_string', 'dateString'),
+        ('action', 'action'),
+        ('sold_ticker', 'soldTicker'),
+        ('sold_price', 'soldPrice'),
+        ('sold_shares', 'soldShares'),
+        ('bought_ticker', 'boughtTicker'),
+        ('bought_price', 'boughtPrice'),
+        ('bought_shares', 'boughtShares'),
+        ('reason', 'reason'),
+        ('profit_loss', 'profitLoss'),
+    )
+
+class Portfolio(Record):
+    __slots__ = ('name', 'emoji', 'initial', 'start_date', 'sell_threshold', 'strategy',
+                 'holdings', 'trades', 'wins', 'losses', 'resets')
+    FIELDS = (
+        ('name', 'name'),
+        ('emoji', 'emoji'),
+        ('initial', 'initial'),
+        ('start_date', 'startDate'),
+        ('sell_threshold', 'sellThreshold'),
+        ('strategy', 'strategy'),
+        ('holdings', 'holdings'),
+        ('trades', 'trades'),       # Bots only
+        ('wins', 'wins'),
+        ('losses', 'losses'),
+        ('resets', 'resets'),
+    )
+
+    @classmethod
+    def _decode(cls, attr, value):
+        if attr == 'holdings':
+            return [Holding.from_dict(h) for h in value]
+        if attr == 'trades':
+            return [Trade.from_dict(t) for t in value]
+        return value
+
+    def _encode(self, attr, value):
+        if attr in ('holdings', 'trades'):
+            return [item.to_dict() for item in value]
+        return value
+
+    @property
+    def is_bot(self):
+        return self.sell_threshold is not None
+
+def load_portfolios(data):
+    """Decode the portfolio_data.json mapping into Portfolio objects"""
+    return {key: Portfolio.from_dict(port) if port else None for key, port in data.items()}
+
+def dump_portfolios(portfolios):
+    """Encode Portfolio objects back into the portfolio_data.json mapping"""
+    return {key: port.to_dict() if port else None for key, port in portfolios.items()}
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+🗂️ PORTFOLIO CONFIG AND STATE SHARDS
+Portfolios are defined by one JSON file each in portfolios/ (the file
+name is the portfolio key) and each portfolio's state lives in its own
+shard file under state/. A run only loads the shards of active
+portfolios and only rewrites the shards whose holdings or trades
+changed, so its cost follows the active field rather than every
+portfolio ever created.
+"""
+
+import os
+from pathlib import Path
+
+from instrumentation import record_io
+from journal import atomic_write
+from models import Holding, Portfolio
+from serializer import DECODE_ERRORS, StateError, decode_state, dumps, loads, validate_state, _is_number
+
+# One <key>.json definition per portfolio
+CONFIG_DIR = 'portfolios'
+
+# One <key>.json state shard per portfolio, plus the snapshot metadata
+STATE_DIR = 'state'
+META_FILE = '_meta.json'
+
+# Portfolio definition: field -> (type check, required)
+CONFIG_SCHEMA = {
+    'name': (str, True),
+    'emoji': (str, True),
+    'initial': (_is_number, False),
+    'order': (_is_number, False),
+    'active': (bool, False),
+    'strategy': (str, False),
+    'sellThreshold': (_is_number, False),  # Makes it a bot
+    'startDate': (str, False),
+    'holdings': (list, False),
+}
+
+DEFAULT_INITIAL = 100000
+
+def _check_definition(key, definition):
+    if not isinstance(definition, dict):
+        raise StateError(f"{key}: expected an object, got {type(definition).__name__}")
+    for field, (check, required) in CONFIG_SCHEMA.items():
+        if field not in definition:
+            if required:
+                raise StateError(f"{key}: missing required field '{field}'")
+            continue
+        value = definition[field]
+        if not (isinstance(value, check) if isinstance(check, type) else check(value)):
+            raise StateError(f"{key}.{field}: unexpected value {value!r}")
+    if 'sellThreshold' not in definition and not ('startDate' in definition and 'holdings' in definition):
+        raise StateError(f"{key}: a portfolio needs 'startDate' and 'holdings' (or 'sellThreshold' for a bot)")
+
+def load_config(config_dir=CONFIG_DIR):
+    """Portfolio definitions keyed by portfolio key, in display order"""
+    definitions = {}
+    for path in sorted(Path(config_dir).glob('*.json')):
+        data = path.read_bytes()
+        record_io('read', len(data), path)
+        try:
+            definition = loads(data)
+        except DECODE_ERRORS as e:
+            raise StateError(f"{path}: not valid JSON: {e}") from e
+        _check_definition(path.stem, definition)
+        definitions[path.stem] = definition
+    if not definitions:
+        raise StateError(f"No portfolio definitions found in {config_dir}/")
+    order = sorted(definitions, key=lambda key: (definitions[key].get('order', float('inf')), key))
+    return {key: definitions[key] for key in order}
+
+def active_keys(config):
+    """Keys of the portfolios that take part in runs"""
+    return [key for key, definition in config.items() if definition.get('active', True)]
+
+def is_bot(definition):
+    return 'sellThreshold' in definition
+
+def new_portfolio(definition):
+    """Starting state of a configured (non-bot) portfolio"""
+    return Portfolio(
+        name=definition['name'],
+        emoji=definition['emoji'],
+        initial=definition.get('initial', DEFAULT_INITIAL),
+        start_date=definition['startDate'],
+        strategy=definition.get('strategy'),
+        holdings=[Holding.from_dict(h) for h in definition['holdings']],
+    )
+
+def _decode(path, data):
+    try:
+        return loads(data)
+    except DECODE_ERRORS as e:
+        raise StateError(f"{path}: not valid JSON: {e}") from e
+
+class ShardStore:
+    """Per-portfolio state files plus the journal position they were written at
+
+    Each shard records the journal seq it includes, so a crash between
+    writing shards and the metadata never applies a journal entry twice.
+    """
+
+    def __init__(self, path=STATE_DIR):
+        self.path = Path(path)
+        self.written = 0
+
+    def _shard(self, key):
+        return self.path / f'{key}.json'
+
+    def exists(self):
+        return (self.path / META_FILE).exists()
+
+    def keys(self):
+        """Every portfolio with a shard on disk, active or not"""
+        return sorted(p.stem for p in self.path.glob('*.json') if p.name != META_FILE)
+
+    def read_meta(self):
+        path = self.path / META_FILE
+        if not path.exists():
+            return {}
+        data = path.read_bytes()
+        record_io('read', len(data), path)
+        return _decode(path, data)
+
+    def write_meta(self, meta):
+        self.path.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path / META_FILE, dumps(meta))
+
+    def load(self, key):
+        """(Portfolio, journal seq it includes), or (None, 0) if the key has no shard"""
+        path = self._shard(key)
+        if not path.exists():
+            return None, 0
+        data = path.read_bytes()
+        record_io('read', len(data), path)
+        shard = _decode(path, data)
+        if not isinstance(shard, dict) or not {'journalSeq', 'portfolio'} <= shard.keys():
+            raise StateError(f"{path}: not a state shard (expected 'journalSeq' and 'portfolio')")
+        validate_state({key: shard['portfolio']})
+        return Portfolio.from_dict(shard['portfolio']), shard['journalSeq']
+
+    def write(self, key, portfolio, seq, compact=False):
+        self.path.mkdir(parents=True, exist_ok=True)
+        atomic_write(self._shard(key), dumps({'journalSeq': seq, 'portfolio': portfolio.to_dict()},
+                                             compact=compact))
+        self.written += 1
+
+def read_snapshot(path):
+    """Portfolios and metadata of a single-file portfolio_data.json snapshot"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    record_io('read', len(data), path)
+    saved = decode_state(data)
+    meta = saved.pop('_meta', {})
+    return {key: Portfolio.from_dict(port) for key, port in saved.items() if port}, meta
+
+class SnapshotStore:
+    """Read-only view of an unmigrated snapshot, with ShardStore's read interface"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.portfolios, self.meta = read_snapshot(path)
+
+    def exists(self):
+        return True
+
+    def read_meta(self):
+        return self.meta
+
+    def load(self, key):
+        port = self.portfolios.get(key)
+        return (port, self.meta.get('journalSeq', 0)) if port else (None, 0)
+
+def migrate_snapshot(path, store):
+    """Split a single-file portfolio_data.json snapshot into shards, then remove it"""
+    portfolios, meta = read_snapshot(path)
+    seq = meta.get('journalSeq', 0)
+    for key, port in portfolios.items():
+        store.write(key, port, seq)
+    store.write_meta({'journalSeq': seq, 'lastSession': meta.get('lastSession')})
+    os.remove(path)
+    print(f"📦 Migrated {path} into {store.written} state shards in {store.path}/")
@@ -2,595 +2,985 @@
 """
 🤖 AUTONOMOUS PORTFOLIO TRACKER
 Runs daily at 4:05 PM EST via GitHub Actions
-Tracks 5 competing portfolios with real-time market data
+Tracks the competing portfolios defined in portfolios/ with real-time market data
 """
 
-import yfinance as yf
-import json
+import argparse
+import cProfile
 import datetime
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 
-# Portfolio data file
+from price_cache import PriceCache, PRICE_CACHE_FILE
+from price_history import PriceHistory, frame_to_bars, rows_to_bars
+from dashboard import DASHBOARD_FILE, write_dashboard
+import instrumentation
+from instrumentation import RUN_REPORT_FILE, record_fetch, stage
+from journal import Journal, MemoryJournal, SNAPSHOT_EVERY, atomic_write
+from market_calendar import current_session, session_close, sessions_between
+from metrics import EquityMetrics
+from models import Holding, Trade, Portfolio
+from portfolio_store import (CONFIG_DIR, DEFAULT_INITIAL, ShardStore, SnapshotStore, active_keys,
+                             is_bot, load_config, migrate_snapshot, new_portfolio)
+from selection import AlternativeSelector, SELECTORS, default_seed, from_description
+from serializer import dumps, loads
+from stream import traded_after, traded_on
+from triggers import TriggerIndex
+from valuation import Valuation
+
+# Pre-shard single-file snapshot (split into state/ shards on first load)
 DATA_FILE = 'portfolio_data.json'
+COMPACT_STATE = False  # Write state shards without indentation (smaller, faster)
+
+# Price fetching
+FETCH_MODE = 'batch'   # 'batch' (chunked downloads) or 'concurrent' (one request per ticker)
+FETCH_CHUNK_SIZE = 50  # Tickers per batched download request
+FETCH_WORKERS = 8      # Max concurrent single-ticker requests
+FETCH_TIMEOUT = 15     # Seconds allowed per ticker, including retries
+FETCH_RETRIES = 2      # Extra attempts per ticker after a rate-limit error
+FETCH_BACKOFF = 1.0    # Initial rate-limit backoff in seconds, doubled per retry
+
+# Shared local quote server (see quote_server.py), e.g. http://127.0.0.1:8765
+QUOTE_SERVER = os.environ.get('PORTFOLIO_QUOTE_SERVER')
+HISTORY_BOOTSTRAP_PERIOD = '1y'  # History downloaded the first time a ticker is seen
+
+# Bot strategy
+BOT_TICKERS = ['AVGO', 'PM', 'JPM', 'WFC', 'NVDA', 'COP', 'PFE', 'TGT', 'MO', 'BAC']
+BOT_ALTERNATIVES = ['MSFT', 'AAPL', 'GOOGL', 'AMZN', 'META']
+BOT_POSITION_SIZE = 10000  # ~$10k per position
+BOT_SELECTOR = 'random'    # How bots pick the replacement stock (see selection.py)
+
+# Per-run record of selector, seed and inputs, for exact replays
+RUN_LOG_FILE = 'run_log.jsonl'
+RUN_LOG_DAYS = 90  # Older sessions are dropped from the log
+
+# Seconds between price polls in --stream mode
+STREAM_INTERVAL = 60
+
+# Default pstats output of --profile
+PROFILE_FILE = 'run_profile.pstats'
 
 # Initialize portfolios
-def initialize_portfolios():
-    """Initialize or load portfolio data"""
-    
-    # Your actual TradingView positions
-    portfolios = {
-        'ceri': {
-            'name': 'CERI (Buy & Hold)',
-            'emoji': '👤',
-            'initial': 100000,
-            'startDate': '2026-01-03',
-            'strategy': 'Quarterly rebalance only',
-            'holdings': [
-                {'ticker': 'AVGO', 'entry': 346.35, 'shares': 28.86},
-                {'ticker': 'NVDA', 'entry': 185.89, 'shares': 53.8},
-                {'ticker': 'WMT', 'entry': 114.94, 'shares': 87},
-                {'ticker': 'IBKR', 'entry': 70.21, 'shares': 142.4},
-                {'ticker': 'ORCL', 'entry': 199.78, 'shares': 50.04},
-                {'ticker': 'UNH', 'entry': 345.57, 'shares': 28.93},
-                {'ticker': 'NEM', 'entry': 108.58, 'shares': 92.08},
-                {'ticker': 'TGT', 'entry': 105.30, 'shares': 94.95},
-                {'ticker': 'PYPL', 'entry': 57.50, 'shares': 173.94},
-                {'ticker': 'MO', 'entry': 57.38, 'shares': 174.27}
-            ]
-        },
-        'assisted': {
-            'name': 'AI-Assisted',
-            'emoji': '💡',
-            'initial': 100000,
-            'startDate': '2026-01-10',
-            'strategy': 'Claude recommends, you decide',
-            'holdings': [
-                {'ticker': 'AVGO', 'entry': 346.35, 'shares': 28.86},
-                {'ticker': 'NVDA', 'entry': 185.89, 'shares': 53.8},
-                {'ticker': 'WMT', 'entry': 114.94, 'shares': 87},
-                {'ticker': 'IBKR', 'entry': 70.21, 'shares': 142.4},
-                {'ticker': 'ORCL', 'entry': 199.78, 'shares': 50.04},
-                {'ticker': 'UNH', 'entry': 345.57, 'shares': 28.93},
-                {'ticker': 'NEM', 'entry': 108.58, 'shares': 92.08},
-                {'ticker': 'TGT', 'entry': 105.30, 'shares': 94.95},
-                {'ticker': 'PYPL', 'entry': 57.50, 'shares': 173.94},
-                {'ticker': 'MO', 'entry': 57.38, 'shares': 174.27}
-            ]
-        }
-    }
+def initialize_portfolios(journal=None, config_dir=CONFIG_DIR, store=None, read_only=False):
+    """Load the active portfolios (state shards plus journal tail), creating new ones from their config
+
+    read_only loads the same state without writing anything: no snapshot
+    migration, no shard writes and no journal entries.
+    """
+    config = load_config(config_dir)
+    store = store or ShardStore()
     
-    # Load existing data or create new bot portfolios
-    if os.path.exists(DATA_FILE):
-        print("📂 Loading existing portfolio data...")
-        with open(DATA_FILE, 'r') as f:
-            saved = json.load(f)
-            portfolios.update(saved)
-    else:
-        print("🆕 First run - initializing bot portfolios...")
-        # Bots will be initialized with current prices below
-        portfolios['conservative'] = None
-        portfolios['moderate'] = None
-        portfolios['aggressive'] = None
+    # One-time split of the old single-file snapshot (read in place when read-only)
+    if not store.exists() and os.path.exists(DATA_FILE):
+        if read_only:
+            store = SnapshotStore(DATA_FILE)
+        else:
+            migrate_snapshot(DATA_FILE, store)
+    meta = store.read_meta()
+    
+    active = active_keys(config)
+    print(f"📂 Loading {len(active)} active portfolios ({len(config)} configured)...")
+    portfolios, applied = {}, {}
+    for key in active:
+        portfolios[key], applied[key] = store.load(key)
+    
+    # Bring the shards up to date with trades logged since they were written
+    if journal:
+        journal.last_session = meta.get('lastSession')
+        snapshot_seq = meta.get('journalSeq', 0)
+        # Inactive portfolios with entries still in the journal are replayed
+        # too, then written straight back so compaction can't lose them
+        retired = {entry['key'] for entry in journal.entries(after=snapshot_seq) if 'key' in entry}
+        retired -= set(portfolios)
+        for key in retired:
+            portfolios[key], applied[key] = store.load(key)
+        replayed = journal.replay(portfolios, snapshot_seq, applied)
+        if replayed:
+            print(f"📜 Replayed {replayed} journal entries since last snapshot")
+        for key in retired:
+            port = portfolios.pop(key)
+            if port and key in journal.dirty and not read_only:
+                store.write(key, port, journal.seq)
+                journal.dirty.discard(key)
+    
+    # Portfolios configured since the last run (bots wait for prices in ensure_bots)
+    for key in active:
+        if portfolios[key] is None and not is_bot(config[key]):
+            print(f"🆕 Creating portfolio {key} from {config_dir}/{key}.json")
+            portfolios[key] = new_portfolio(config[key])
+            if journal and not read_only:
+                journal.record_portfolio(key, portfolios[key])
     
     return portfolios
 
-def fetch_current_prices(tickers):
-    """Fetch current closing prices for all stocks"""
-    print(f"\n💰 Fetching closing prices for {len(tickers)} stocks...")
-    prices = {}
+def bot_keys(portfolios):
+    """Keys of the bot portfolios, in display order"""
+    return [key for key, port in portfolios.items() if port and port.is_bot]
+
+def save_portfolios(portfolios, journal, force=False, compact=COMPACT_STATE, store=None):
+    """Rewrite the shards of changed portfolios once enough journal entries have piled up"""
+    store = store or ShardStore()
+    if not force and store.exists() and journal.pending < SNAPSHOT_EVERY:
+        print(f"✅ {journal.pending} journal entries pending (snapshot every {SNAPSHOT_EVERY})")
+        return False
     
-    for ticker in tickers:
+    # Untouched portfolios keep their shards as they are
+    changed = sorted(key for key in journal.dirty if portfolios.get(key))
+    for key in changed:
+        store.write(key, portfolios[key], journal.seq, compact)
+    store.write_meta({'journalSeq': journal.seq, 'lastSession': journal.last_session})
+    journal.compact(journal.seq)
+    journal.dirty.clear()
+    print(f"✅ Snapshot written: {len(changed)}/{len(portfolios)} shards updated in {store.path}/")
+    return True
+
+def _history_kwargs(start):
+    """Date range for a history request: resume from `start`, or bootstrap"""
+    return {'start': start.isoformat()} if start else {'period': HISTORY_BOOTSTRAP_PERIOD}
+
+def _yfinance():
+    """Import yfinance on first use (it pulls in pandas and requests)"""
+    import yfinance
+    return yfinance
+
+def _download_history(chunk, start, timeout=FETCH_TIMEOUT):
+    """Download daily bars for a chunk of tickers in a single request"""
+    yf = _yfinance()
+    # Unadjusted prices so stored bars never change after the fact
+    data = yf.download(chunk, group_by='ticker', auto_adjust=False, threads=False,
+                       progress=False, timeout=timeout, **_history_kwargs(start))
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    
+    for ticker in chunk:
+        try:
+            # Multi-ticker frames are keyed (ticker, field); older yfinance
+            # returns flat columns when the chunk holds a single ticker
+            frame = data[ticker] if data.columns.nlevels > 1 else data
+            frame = frame.dropna(subset=['Close'])
+        except KeyError:
+            continue
+        if not frame.empty:
+            frames[ticker] = frame
+    
+    return frames
+
+def _is_rate_limited(error):
+    """Check whether a fetch error is Yahoo throttling us"""
+    message = str(error)
+    return (type(error).__name__ == 'YFRateLimitError'
+            or 'Too Many Requests' in message or '429' in message)
+
+def _fetch_single_history(ticker, start, timeout, retries):
+    """Fetch one ticker's daily bars, backing off exponentially when rate limited"""
+    yf = _yfinance()
+    delay = FETCH_BACKOFF
+    for attempt in range(retries + 1):
+        try:
+            return yf.Ticker(ticker).history(auto_adjust=False, timeout=timeout, **_history_kwargs(start))
+        except Exception as e:
+            if not _is_rate_limited(e) or attempt == retries:
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+def _store_close(history, ticker, frame, timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES):
+    """Append fetched bars to the history store and read back the latest close
+
+    If the bars restate the last stored session (a split adjusted the
+    earlier prices), everything from the first stored session on is
+    fetched again instead.
+    """
+    if frame is None or frame.empty:
+        return None
+    bars = frame_to_bars(frame)
+    if history.restated(ticker, bars):
+        print(f"  ↻ {ticker}: stored history was restated (split?), fetching it again")
+        began = time.monotonic()
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period='2d')  # Get last 2 days to ensure data
-            if not hist.empty:
-                price = round(hist['Close'].iloc[-1], 2)
-                prices[ticker] = price
-                print(f"  ✓ {ticker}: ${price}")
+            frame = _fetch_single_history(ticker, history.first_date(ticker), timeout, retries)
+        except Exception as e:
+            # Keep the old history; the next run notices the mismatch again
+            print(f"  ✗ {ticker}: Error refetching history - {str(e)}")
+            return None
+        finally:
+            record_fetch([ticker], time.monotonic() - began)
+        if frame is None or frame.empty:
+            return None
+        history.replace(ticker, frame_to_bars(frame))
+    else:
+        history.append(ticker, bars)
+    close = history.last_close(ticker)
+    return None if close is None else round(close, 2)
+
+def fetch_prices_concurrently(tickers, history, workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES):
+    """Fetch closes one ticker per request on a bounded thread pool"""
+    prices = {}
+    started = {}
+    
+    def fetch(ticker):
+        started[ticker] = time.monotonic()
+        return _fetch_single_history(ticker, history.last_date(ticker), timeout, retries)
+    
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {pool.submit(fetch, ticker): ticker for ticker in tickers}
+    pending = set(futures)
+    
+    while pending:
+        done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+        for future in done:
+            ticker = futures[future]
+            record_fetch([ticker], time.monotonic() - started[ticker])
+            try:
+                price = _store_close(history, ticker, future.result(), timeout, retries)
+            except Exception as e:
+                print(f"  ✗ {ticker}: Error - {str(e)}")
+                price = None
             else:
-                print(f"  ✗ {ticker}: No data available")
+                if price is None:
+                    print(f"  ✗ {ticker}: No data available")
+                else:
+                    print(f"  ✓ {ticker}: ${price}")
+            prices[ticker] = price
+        
+        # Give up on tickers that have used their whole time budget
+        now = time.monotonic()
+        for future in list(pending):
+            ticker = futures[future]
+            if ticker in started and now - started[ticker] > timeout:
+                pending.discard(future)
+                record_fetch([ticker], now - started[ticker])
+                print(f"  ✗ {ticker}: Timed out after {timeout}s")
                 prices[ticker] = None
-        except Exception as e:
-            print(f"  ✗ {ticker}: Error - {str(e)}")
-            prices[ticker] = None
     
+    # Don't block on requests that timed out; their results are discarded
+    pool.shutdown(wait=False, cancel_futures=True)
+    return prices
+
+def fetch_from_quote_server(tickers, server, timeout=FETCH_TIMEOUT, history=None, stamps=None):
+    """Get prices from a running quote server; None if it can't be reached
+
+    The server's stored bars are appended to the local history store so
+    catch-up and the history-based selectors see the same sessions, and
+    each quote's upstream fetch time is put in `stamps` for the price cache.
+    """
+    from quote_server import fetch_bars, fetch_quotes
+    
+    print(f"\n🛰️  Fetching {len(tickers)} prices from quote server {server}...")
+    history = history or PriceHistory()
+    try:
+        began = time.monotonic()
+        quotes = fetch_quotes(tickers, server, timeout)
+        record_fetch(tickers, time.monotonic() - began)
+        began = time.monotonic()
+        bars = fetch_bars({ticker: history.last_date(ticker) for ticker in tickers}, server, timeout)
+        record_fetch(tickers, time.monotonic() - began)
+    except (OSError, ValueError) as e:
+        print(f"  ⚠️  Quote server unavailable ({e}); fetching directly")
+        return None
+    
+    for ticker, rows in bars.items():
+        fetched = rows_to_bars(rows)
+        if history.restated(ticker, fetched):
+            # The server refetched this ticker after a split; take its whole history
+            try:
+                history.replace(ticker, rows_to_bars(fetch_bars({ticker: None}, server, timeout)[ticker]))
+            except (OSError, ValueError) as e:
+                print(f"  ✗ {ticker}: Error refetching history - {e}")
+        else:
+            history.append(ticker, fetched)
+    
+    prices = {}
+    for ticker in tickers:
+        quote = quotes[ticker]
+        prices[ticker] = quote and quote['price']
+        if quote is None:
+            print(f"  ✗ {ticker}: No data available")
+        else:
+            print(f"  ✓ {ticker}: ${quote['price']}")
+            if stamps is not None:
+                stamps[ticker] = quote['fetchedAt']
     return prices
 
-def initialize_bot_portfolio(bot_name, sell_threshold, current_prices):
+def fetch_current_prices(tickers, mode=FETCH_MODE, chunk_size=FETCH_CHUNK_SIZE,
+                         workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES,
+                         history=None, server=QUOTE_SERVER, stamps=None):
+    """Fetch current closing prices for all stocks via the history store (or a quote server)
+
+    Quotes served from a quote server's cache may be older than this call;
+    their fetch times (epoch seconds) go into `stamps` when given.
+    """
+    tickers = list(tickers)
+    if server:
+        prices = fetch_from_quote_server(tickers, server, timeout, history, stamps)
+        if prices is not None:
+            return prices
+    
+    history = history or PriceHistory()
+    print(f"\n💰 Fetching closing prices for {len(tickers)} stocks...")
+    prices = {}
+    failed = tickers
+    
+    if mode == 'batch':
+        # Group tickers by where their stored history ends so each request
+        # only asks for the sessions that are missing
+        by_start = {}
+        for ticker in tickers:
+            by_start.setdefault(history.last_date(ticker), []).append(ticker)
+        
+        failed = []
+        for start, group in by_start.items():
+            for offset in range(0, len(group), chunk_size):
+                chunk = group[offset:offset + chunk_size]
+                began = time.monotonic()
+                try:
+                    frames = _download_history(chunk, start, timeout)
+                except Exception as e:
+                    print(f"  ✗ Batch of {len(chunk)} tickers: Error - {str(e)}")
+                    frames = {}
+                record_fetch(chunk, time.monotonic() - began)
+                
+                for ticker in chunk:
+                    price = _store_close(history, ticker, frames.get(ticker), timeout, retries)
+                    if price is None:
+                        failed.append(ticker)
+                    else:
+                        prices[ticker] = price
+                        print(f"  ✓ {ticker}: ${price}")
+        
+        if failed:
+            print(f"  ↻ Retrying {len(failed)} failed tickers individually...")
+    
+    # Anything the batches missed gets its own request
+    if failed:
+        prices.update(fetch_prices_concurrently(failed, history, workers, timeout, retries))
+    
+    # Keep the caller's ticker order
+    return {ticker: prices.get(ticker) for ticker in tickers}
+
+def get_prices(tickers, offline=False, refresh=False, cache_path=PRICE_CACHE_FILE, server=QUOTE_SERVER):
+    """Serve prices from the local cache, fetching only what is stale"""
+    tickers = list(tickers)
+    cache = PriceCache(cache_path)
+    
+    try:
+        if offline:
+            prices = cache.latest(tickers)
+            print(f"\n📦 Offline mode: {len(prices)}/{len(tickers)} prices loaded from cache")
+            for ticker in tickers:
+                if ticker not in prices:
+                    print(f"  ✗ {ticker}: Not in cache")
+            return {ticker: prices.get(ticker) for ticker in tickers}
+        
+        prices = {} if refresh else cache.fresh(tickers)
+        if prices:
+            print(f"\n📦 {len(prices)}/{len(tickers)} prices still fresh in cache")
+        
+        stale = [ticker for ticker in tickers if ticker not in prices]
+        if stale:
+            stamps = {}
+            fetched = fetch_current_prices(stale, server=server, stamps=stamps)
+            cache.store(fetched, fetched_at=stamps)
+            prices.update(fetched)
+    finally:
+        cache.close()
+    
+    return {ticker: prices.get(ticker) for ticker in tickers}
+
+def initialize_bot_portfolio(bot_name, sell_threshold, current_prices, emoji=None, initial=DEFAULT_INITIAL,
+                             strategy=None):
     """Initialize a bot portfolio with current market prices"""
-    bot_tickers = ['AVGO', 'PM', 'JPM', 'WFC', 'NVDA', 'COP', 'PFE', 'TGT', 'MO', 'BAC']
     holdings = []
     
-    for ticker in bot_tickers:
+    for ticker in BOT_TICKERS:
         price = current_prices.get(ticker)
         if price and price > 0:
-            shares = int(10000 / price)  # ~$10k per position
-            holdings.append({
-                'ticker': ticker,
-                'entry': price,
-                'shares': shares
-            })
+            shares = int(BOT_POSITION_SIZE / price)
+            holdings.append(Holding(ticker=ticker, entry=price, shares=shares))
     
-    emoji = '🐢' if 'conservative' in bot_name.lower() else '🏃' if 'moderate' in bot_name.lower() else '🚀'
+    if emoji is None:
+        emoji = '🐢' if 'conservative' in bot_name.lower() else '🏃' if 'moderate' in bot_name.lower() else '🚀'
     
-    return {
-        'name': bot_name,
-        'emoji': emoji,
-        'initial': 100000,
-        'startDate': datetime.datetime.now().strftime('%Y-%m-%d'),
-        'sellThreshold': sell_threshold,
-        'strategy': f'Sell at {sell_threshold}%',
-        'holdings': holdings,
-        'trades': [],
-        'wins': 0,
-        'losses': 0,
-        'resets': 0
-    }
+    return Portfolio(
+        name=bot_name,
+        emoji=emoji,
+        initial=initial,
+        start_date=datetime.datetime.now().strftime('%Y-%m-%d'),
+        sell_threshold=sell_threshold,
+        strategy=strategy or f'Sell at {sell_threshold}%',
+        holdings=holdings,
+        trades=[],
+        wins=0,
+        losses=0,
+        resets=0
+    )
 
 def calculate_portfolio_value(portfolio, current_prices):
     """Calculate current value of a portfolio"""
     total = 0
-    for holding in portfolio['holdings']:
-        price = current_prices.get(holding['ticker'], holding['entry'])
+    for holding in portfolio.holdings:
+        price = current_prices.get(holding.ticker, holding.entry)
         if price:
-            total += price * holding['shares']
+            total += price * holding.shares
     return total
 
-def check_bot_trades(portfolios, current_prices):
-    """Check if any bot should make autonomous trades"""
-    alternatives = ['MSFT', 'AAPL', 'GOOGL', 'AMZN', 'META']
+def check_bot_trades(portfolios, current_prices, journal=None, selector=None, tickers=None, skip=(),
+                     index=None, as_of=None):
+    """Check if any bot should make autonomous trades (logging them to the journal)
+
+    tickers limits the check to holdings of those tickers (e.g. the ones whose
+    price moved in streaming mode); bots in skip are not checked at all.
+    With a TriggerIndex only holdings whose trigger price was crossed are
+    visited, and the index is kept in step with the trades made. as_of
+    timestamps the trades (default: now), e.g. for sessions being caught up.
+    """
+    alternatives = BOT_ALTERNATIVES
+    selector = selector or AlternativeSelector(BOT_SELECTOR, default_seed(current_session()))
     trades_made = []
+    candidates = index.candidates(current_prices, tickers) if index is not None else None
     
-    for bot_key in ['conservative', 'moderate', 'aggressive']:
-        if not portfolios[bot_key]:
+    for bot_key in bot_keys(portfolios):
+        if bot_key in skip:
             continue
             
         bot = portfolios[bot_key]
+        slots = range(len(bot.holdings)) if candidates is None else candidates.get(bot_key, [])
         
-        for i, holding in enumerate(bot['holdings']):
-            current_price = current_prices.get(holding['ticker'])
+        for i in slots:
+            holding = bot.holdings[i]
+            if tickers is not None and holding.ticker not in tickers:
+                continue
+            current_price = current_prices.get(holding.ticker)
             if not current_price:
                 continue
             
-            change_percent = ((current_price - holding['entry']) / holding['entry']) * 100
+            change_percent = ((current_price - holding.entry) / holding.entry) * 100
             
             # Check if sell threshold hit
-            if change_percent <= bot['sellThreshold']:
-                sell_value = current_price * holding['shares']
-                loss = sell_value - (holding['entry'] * holding['shares'])
+            if change_percent <= bot.sell_threshold:
+                sell_value = current_price * holding.shares
+                loss = sell_value - (holding.entry * holding.shares)
                 
                 # Pick alternative with valid price
-                import random
                 valid_alts = [t for t in alternatives if current_prices.get(t)]
                 if not valid_alts:
                     continue
                 
-                new_ticker = random.choice(valid_alts)
+                new_ticker = selector.pick(valid_alts)
                 new_price = current_prices[new_ticker]
                 new_shares = int(sell_value / new_price)
                 
                 # Log trade
-                trade = {
-                    'date': datetime.datetime.now().isoformat(),
-                    'dateString': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'action': 'AUTONOMOUS TRADE',
-                    'soldTicker': holding['ticker'],
-                    'soldPrice': round(current_price, 2),
-                    'soldShares': holding['shares'],
-                    'boughtTicker': new_ticker,
-                    'boughtPrice': round(new_price, 2),
-                    'boughtShares': new_shares,
-                    'reason': f"{holding['ticker']} down {change_percent:.2f}% (trigger: {bot['sellThreshold']}%)",
-                    'profitLoss': round(loss, 2)
-                }
+                traded_at = as_of or datetime.datetime.now()
+                trade = Trade(
+                    date=traded_at.isoformat(),
+                    date_string=traded_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    action='AUTONOMOUS TRADE',
+                    sold_ticker=holding.ticker,
+                    sold_price=round(current_price, 2),
+                    sold_shares=holding.shares,
+                    bought_ticker=new_ticker,
+                    bought_price=round(new_price, 2),
+                    bought_shares=new_shares,
+                    reason=f"{holding.ticker} down {change_percent:.2f}% (trigger: {bot.sell_threshold}%)",
+                    profit_loss=round(loss, 2)
+                )
                 
-                bot['trades'].append(trade)
+                bot.trades.append(trade)
                 trades_made.append((bot_key, trade))
                 
                 # Update holdings
-                bot['holdings'][i] = {
-                    'ticker': new_ticker,
-                    'entry': new_price,
-                    'shares': new_shares
-                }
+                bot.holdings[i] = Holding(ticker=new_ticker, entry=new_price, shares=new_shares)
+                if index is not None:
+                    index.replace(bot_key, i, bot.holdings[i], bot.sell_threshold)
+                if journal:
+                    journal.record_trade(bot_key, i, trade, bot.holdings[i])
                 
                 # Update stats
                 if loss >= 0:
-                    bot['wins'] += 1
+                    bot.wins += 1
                 else:
-                    bot['losses'] += 1
+                    bot.losses += 1
                 
-                print(f"\n🤖 {bot['name']}: AUTONOMOUS TRADE!")
-                print(f"   SOLD {trade['soldTicker']} ({trade['soldShares']} @ ${trade['soldPrice']})")
-                print(f"   BOUGHT {trade['boughtTicker']} ({trade['boughtShares']} @ ${trade['boughtPrice']})")
-                print(f"   Reason: {trade['reason']}")
-                print(f"   P/L: ${trade['profitLoss']}")
+                print(f"\n🤖 {bot.name}: AUTONOMOUS TRADE!")
+                print(f"   SOLD {trade.sold_ticker} ({trade.sold_shares} @ ${trade.sold_price})")
+                print(f"   BOUGHT {trade.bought_ticker} ({trade.bought_shares} @ ${trade.bought_price})")
+                print(f"   Reason: {trade.reason}")
+                print(f"   P/L: ${trade.profit_loss}")
                 
                 break  # One trade per bot per day
     
     return trades_made
 
-def generate_html(portfolios, current_prices):
-    """Generate beautiful HTML dashboard"""
+def _trade_inputs(portfolios, skip=()):
+    """The bot state check_bot_trades reads (bots in skip aren't checked), for the run log"""
+    return {
+        key: {
+            'name': portfolios[key].name,
+            'sellThreshold': portfolios[key].sell_threshold,
+            'holdings': [h.to_dict() for h in portfolios[key].holdings],
+        }
+        for key in bot_keys(portfolios) if key not in skip
+    }
+
+def _trade_outcome(trades):
+    """Trades without their wall-clock timestamps, for comparing replays"""
+    return [[key, {k: v for k, v in trade.to_dict().items() if k not in ('date', 'dateString')}]
+            for key, trade in trades]
+
+def record_run(session, selector, current_prices, inputs, trades, path=RUN_LOG_FILE, tickers=None):
+    """Append this run's selector, seed and trading inputs to the run log
+
+    tickers records the holdings a streaming check was limited to.
+    """
+    entry = {
+        'runAt': datetime.datetime.now().isoformat(),
+        'session': session.isoformat(),
+        'selector': selector.describe(),
+        'prices': current_prices,
+        'bots': inputs,
+        'trades': _trade_outcome(trades),
+    }
+    if tickers is not None:
+        entry['tickers'] = sorted(tickers)
+    with open(path, 'ab') as f:
+        f.write(dumps(entry, compact=True) + b'\n')
+
+def rotate_run_log(session, path=RUN_LOG_FILE, keep_days=RUN_LOG_DAYS):
+    """Drop run log entries older than keep_days before session; returns how many were dropped"""
+    if not os.path.exists(path):
+        return 0
+    cutoff = (session - datetime.timedelta(days=keep_days)).isoformat()
+    with open(path, 'rb') as f:
+        # Entries are appended in session order, so the first line tells whether any expired
+        first = f.readline()
+        if not first or loads(first)['session'] >= cutoff:
+            return 0
+        lines = [first, *f]
+    kept = [line for line in lines if loads(line)['session'] >= cutoff]
+    atomic_write(path, b''.join(kept))
+    print(f"🗑️  Dropped {len(lines) - len(kept)} run log entries from before {cutoff}")
+    return len(lines) - len(kept)
+
+def replay_run(session, path=RUN_LOG_FILE):
+    """Re-run every logged trade check of a session and compare with what happened"""
+    entries = []
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            entries = [entry for entry in map(loads, f) if entry['session'] == session]
+    if not entries:
+        print(f"✗ No run recorded for session {session}")
+        return False
     
-    # Calculate all values
-    values = {}
-    for key in portfolios:
-        if portfolios[key]:
-            values[key] = calculate_portfolio_value(portfolios[key], current_prices)
-    
-    # Create standings
-    standings = [
-        {'key': k, 'name': portfolios[k]['emoji'] + ' ' + portfolios[k]['name'], 'value': v}
-        for k, v in values.items()
-    ]
-    standings.sort(key=lambda x: x['value'], reverse=True)
-    
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🏆 Portfolio Competition - Live Dashboard</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 1800px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-        .header h1 {{ font-size: 2.5em; margin-bottom: 10px; }}
-        .subtitle {{ font-size: 1.2em; opacity: 0.9; margin-top: 5px; }}
-        .update-badge {{
-            background: rgba(255,255,255,0.2);
-            padding: 10px 20px;
-            border-radius: 20px;
-            margin-top: 15px;
-            display: inline-block;
-            font-size: 0.9em;
-        }}
-        .auto-badge {{
-            background: #51cf66;
-            color: white;
-            padding: 8px 15px;
-            border-radius: 15px;
-            margin: 10px;
-            display: inline-block;
-            font-weight: bold;
-            animation: pulse 2s infinite;
-        }}
-        @keyframes pulse {{
-            0%, 100% {{ opacity: 1; }}
-            50% {{ opacity: 0.7; }}
-        }}
-        .leaderboard {{
-            background: #f8f9fa;
-            padding: 30px;
-        }}
-        .leaderboard h2 {{
-            text-align: center;
-            color: #667eea;
-            margin-bottom: 20px;
-            font-size: 2em;
-        }}
-        .leader-row {{
-            background: white;
-            padding: 20px;
-            margin: 10px 0;
-            border-radius: 10px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .leader-row.first {{
-            background: linear-gradient(135deg, #ffd700 0%, #ffed4e 100%);
-            font-weight: bold;
-            font-size: 1.1em;
-        }}
-        .rank {{
-            font-size: 1.5em;
-            font-weight: bold;
-            color: #667eea;
-            width: 40px;
-        }}
-        .positive {{ color: #28a745; }}
-        .negative {{ color: #dc3545; }}
-        .bot-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-            gap: 30px;
-            padding: 30px;
-        }}
-        .bot-card {{
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            border: 3px solid #667eea;
-        }}
-        .bot-card.winning {{
-            border-color: #51cf66;
-            background: #f0fff4;
-        }}
-        .bot-header {{
-            border-bottom: 2px solid #e9ecef;
-            padding-bottom: 15px;
-            margin-bottom: 15px;
-        }}
-        .bot-title {{
-            font-size: 1.5em;
-            font-weight: bold;
-            color: #667eea;
-        }}
-        .bot-value {{
-            font-size: 2.5em;
-            font-weight: bold;
-            margin: 10px 0;
-        }}
-        .bot-stats {{
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 8px;
-            margin: 15px 0;
-        }}
-        .stat-row {{
-            display: flex;
-            justify-content: space-between;
-            padding: 5px 0;
-            font-size: 0.95em;
-        }}
-        .trade-log {{
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 8px;
-            margin-top: 15px;
-            max-height: 250px;
-            overflow-y: auto;
-        }}
-        .trade-entry {{
-            background: white;
-            padding: 10px;
-            margin: 8px 0;
-            border-radius: 5px;
-            border-left: 4px solid #667eea;
-            font-size: 0.85em;
-        }}
-        .footer {{
-            background: #333;
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        @media (max-width: 1200px) {{
-            .bot-grid {{ grid-template-columns: 1fr; }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🏆 5-WAY PORTFOLIO COMPETITION</h1>
-            <div class="subtitle">Autonomous AI Trading Lab • Real Market Data</div>
-            <div class="auto-badge">🤖 FULLY AUTONOMOUS</div>
-            <div class="update-badge">
-                📊 Last Updated: {datetime.datetime.now().strftime('%B %d, %Y at %I:%M %p EST')}
-            </div>
-            <p style="margin-top: 15px; font-size: 0.9em;">Updates automatically daily at 4:05 PM EST</p>
-        </div>
+    matched = True
+    for entry in entries:
+        print(f"🔁 Replaying run of {entry['runAt']} (selector: {entry['selector']})")
+        portfolios = {}
+        for key, bot in entry['bots'].items():
+            portfolios[key] = Portfolio(
+                name=bot['name'],
+                sell_threshold=bot['sellThreshold'],
+                holdings=[Holding.from_dict(h) for h in bot['holdings']],
+                trades=[], wins=0, losses=0
+            )
         
-        <div class="leaderboard">
-            <h2>🏆 CURRENT STANDINGS</h2>
-"""
-    
-    # Add leaderboard rows
-    for idx, s in enumerate(standings):
-        port = portfolios[s['key']]
-        change = s['value'] - port['initial']
-        change_pct = (change / port['initial']) * 100
+        selector = from_description(entry['selector'], PriceHistory())
+        tickers = set(entry['tickers']) if 'tickers' in entry else None
+        trades = check_bot_trades(portfolios, entry['prices'], selector=selector, tickers=tickers)
         
-        html += f"""
-            <div class="leader-row {'first' if idx == 0 else ''}">
-                <div style="display: flex; align-items: center; gap: 15px;">
-                    <div class="rank">{idx + 1}.</div>
-                    <div>{s['name']} {'🏆' if idx == 0 else ''}</div>
-                </div>
-                <div style="text-align: right;">
-                    <div style="font-size: 1.5em; font-weight: bold;">${s['value']:,.0f}</div>
-                    <div class="{'positive' if change >= 0 else 'negative'}" style="font-size: 1.1em;">
-                        {'+' if change >= 0 else ''}${change:,.0f} ({change_pct:+.2f}%)
-                    </div>
-                </div>
-            </div>
-"""
+        if _trade_outcome(trades) == entry['trades']:
+            print(f"✅ Replay matches the {len(trades)} recorded trades")
+        else:
+            print("❌ Replay differs from the recorded trades")
+            matched = False
+    return matched
+
+def run_streaming(args, portfolios, current_prices, journal, selector):
+    """Poll prices until stopped, trading bots as soon as a threshold is crossed
+
+    With --simulate the loop trades copies of the portfolios against an
+    in-memory journal, so nothing is saved and the dashboard is left alone.
+    """
+    from stream import SimulatedFeed, YahooFeed, run_stream
     
-    html += """
-        </div>
-        
-        <div class="bot-grid">
-"""
+    if args.simulate:
+        feed = SimulatedFeed(current_prices, selector.seed)
+        portfolios = {key: Portfolio.from_dict(port.to_dict()) for key, port in portfolios.items() if port}
+        journal = MemoryJournal()
+    else:
+        feed = YahooFeed(sorted(current_prices),
+                         lambda tickers: fetch_current_prices(tickers, server=args.quote_server))
     
-    # Add portfolio cards
-    for key in ['ceri', 'assisted', 'conservative', 'moderate', 'aggressive']:
-        if not portfolios[key]:
-            continue
-            
-        port = portfolios[key]
-        value = values[key]
-        change = value - port['initial']
-        change_pct = (change / port['initial']) * 100
-        is_winning = key == standings[0]['key']
-        
-        # Bot-specific stats
-        if key in ['conservative', 'moderate', 'aggressive']:
-            total_trades = len([t for t in port.get('trades', []) if t['action'] == 'AUTONOMOUS TRADE'])
-            win_rate = (port['wins'] / total_trades * 100) if total_trades > 0 else 0
-            
-            stats_html = f"""
-                <div class="bot-stats">
-                    <div class="stat-row">
-                        <span>Win Rate:</span>
-                        <span><strong>{win_rate:.0f}% ({port['wins']}/{total_trades})</strong></span>
-                    </div>
-                    <div class="stat-row">
-                        <span>Total Trades:</span>
-                        <span><strong>{total_trades}</strong></span>
-                    </div>
-                    <div class="stat-row">
-                        <span>Strategy:</span>
-                        <span><strong>{port['strategy']}</strong></span>
-                    </div>
-                </div>
-            """
-            
-            # Recent trades
-            recent_trades = port.get('trades', [])[-5:][::-1]
-            if recent_trades:
-                trades_html = '<div class="trade-log"><div style="font-weight: bold; margin-bottom: 10px;">Recent Trades:</div>'
-                for trade in recent_trades:
-                    trades_html += f"""
-                        <div class="trade-entry">
-                            <div style="color: #6c757d; font-size: 0.85em;">{trade['dateString']}</div>
-                            <div style="margin-top: 5px;"><strong>SOLD:</strong> {trade['soldTicker']} ({trade['soldShares']} @ ${trade['soldPrice']})</div>
-                            <div><strong>BOUGHT:</strong> {trade['boughtTicker']} ({trade['boughtShares']} @ ${trade['boughtPrice']})</div>
-                            <div style="margin-top: 5px; color: #6c757d;">{trade['reason']}</div>
-                            <div class="{'positive' if trade['profitLoss'] >= 0 else 'negative'}" style="margin-top: 5px;">
-                                P/L: {'+' if trade['profitLoss'] >= 0 else ''}${trade['profitLoss']}
-                            </div>
-                        </div>
-                    """
-                trades_html += '</div>'
-            else:
-                trades_html = '<div class="trade-log" style="text-align: center; color: #6c757d; padding: 20px;">No trades yet • Bot monitoring markets daily</div>'
-        else:
-            stats_html = f"""
-                <div class="bot-stats">
-                    <div class="stat-row">
-                        <span>Started:</span>
-                        <span><strong>{port['startDate']}</strong></span>
-                    </div>
-                    <div class="stat-row">
-                        <span>Holdings:</span>
-                        <span><strong>{len(port['holdings'])} stocks</strong></span>
-                    </div>
-                    <div class="stat-row">
-                        <span>Strategy:</span>
-                        <span><strong>{port['strategy']}</strong></span>
-                    </div>
-                </div>
-            """
-            trades_html = ''
-        
-        html += f"""
-            <div class="bot-card {'winning' if is_winning else ''}">
-                <div class="bot-header">
-                    <div class="bot-title">{port['emoji']} {port['name']}</div>
-                </div>
-                <div class="bot-value">${value:,.0f}</div>
-                <div style="font-size: 1.3em; font-weight: bold; margin-bottom: 15px;" class="{'positive' if change >= 0 else 'negative'}">
-                    {'+' if change >= 0 else ''}${change:,.0f} ({change_pct:+.2f}%)
-                </div>
-                {stats_html}
-                {trades_html}
-            </div>
-"""
+    metrics = EquityMetrics()
     
-    html += f"""
-        </div>
-        
-        <div class="footer">
-            <p><strong>🤖 Fully Autonomous Trading Lab</strong></p>
-            <p style="margin-top: 10px;">Updates automatically daily at 4:05 PM EST via GitHub Actions</p>
-            <p style="margin-top: 5px; font-size: 0.9em;">Competition started January 2026 • Ends January 2027</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
+    # Trigger prices only change when a bot trades, so index them once up front
+    index = TriggerIndex(portfolios, bot_keys(portfolios))
+    
+    def check(prices, tickers, skip):
+        # A fresh copy of the session's selector per check, so each logged check replays on its own
+        check_selector = from_description(selector.describe(), selector.history)
+        inputs = _trade_inputs(portfolios, skip)
+        trades = check_bot_trades(portfolios, prices, journal, check_selector, tickers, skip, index)
+        if trades and not args.simulate:
+            record_run(current_session(), check_selector, prices, inputs, trades, tickers=tickers)
+        return trades
     
-    return html
+    def publish(trades, prices):
+        # Trades are already journaled; refresh the dashboard so they show up now
+        write_dashboard(portfolios, Valuation(portfolios, prices), metrics=metrics)
+    
+    source = 'simulated feed' if args.simulate else 'Yahoo Finance'
+    print(f"\n📡 Streaming prices from {source} every {args.interval:g}s (Ctrl+C to stop)...")
+    run_stream(portfolios, feed, check, bot_keys(portfolios),
+               interval=args.interval, ticks=args.ticks, on_trades=None if args.simulate else publish)
+    
+    if args.simulate:
+        print("\n🧪 Simulated trades discarded (state and dashboard unchanged)")
+        return
+    print("\n💾 Saving portfolio data...")
+    save_portfolios(portfolios, journal, force=args.snapshot, compact=args.compact_state)
 
-def main():
-    """Main execution"""
-    print("="*80)
-    print("🤖 AUTONOMOUS PORTFOLIO TRACKER")
-    print("="*80)
-    print(f"⏰ Running at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S EST')}")
-    print()
+def _price_options(subcommand=False):
+    """--offline/--refresh, shared by the full run and the subcommands that fetch"""
+    # Under a subcommand, options left out must not reset ones given before it
+    default = argparse.SUPPRESS if subcommand else False
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--offline', action='store_true', default=default,
+                        help='Run entirely from the local price cache (no network)')
+    parser.add_argument('--refresh', action='store_true', default=default,
+                        help='Ignore cached prices and fetch everything again')
+    parser.add_argument('--quote-server', metavar='URL', default=argparse.SUPPRESS if subcommand else QUOTE_SERVER,
+                        help='Get quotes from a shared quote_server.py instead of Yahoo directly')
+    return parser
+
+def _trade_options(subcommand=False):
+    """Trading and state-saving options, shared by the full run and `trade`"""
+    suppress = argparse.SUPPRESS if subcommand else None
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--snapshot', action='store_true', default=suppress or False,
+                        help='Compact the trade journal into the state shards now')
+    parser.add_argument('--compact-state', action='store_true', default=suppress or COMPACT_STATE,
+                        help='Write state shards without indentation')
+    parser.add_argument('--selector', choices=SELECTORS, default=suppress or BOT_SELECTOR,
+                        help='Rule bots use to pick a replacement stock')
+    parser.add_argument('--seed', type=int, default=suppress,
+                        help='Seed for random picks (default: derived from the trading session)')
+    parser.add_argument('--no-catch-up', action='store_true', default=suppress or False,
+                        help="Don't replay sessions missed since the last run")
+    return parser
+
+def parse_args(argv=None):
+    """Parse command line options (no subcommand = the full daily run)"""
+    parser = argparse.ArgumentParser(description='Autonomous portfolio tracker',
+                                     parents=[_price_options(), _trade_options()])
+    parser.add_argument('--replay', metavar='SESSION',
+                        help='Replay the logged trade checks for a session (YYYY-MM-DD) and exit')
+    parser.add_argument('--stream', action='store_true',
+                        help='Keep polling prices and trade as thresholds are crossed during the day')
+    parser.add_argument('--interval', type=float, default=STREAM_INTERVAL,
+                        help='Seconds between price polls in streaming mode')
+    parser.add_argument('--ticks', type=int,
+                        help='Stop streaming after this many polls (default: run until interrupted)')
+    parser.add_argument('--simulate', action='store_true',
+                        help='Stream from a seeded random-walk feed instead of Yahoo Finance')
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILE, metavar='PATH',
+                        help=f'Profile the run with cProfile and dump pstats data (default: {PROFILE_FILE})')
+    parser.add_argument('--report', default=RUN_REPORT_FILE, metavar='PATH',
+                        help='Where to write the JSON run report (stage timings, fetch latency, I/O)')
     
-    # Load portfolios
-    portfolios = initialize_portfolios()
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.add_parser('fetch', parents=[_price_options(True)],
+                        help='Update the price cache and history only')
+    commands.add_parser('trade', parents=[_price_options(True), _trade_options(True)],
+                        help='Fetch prices, run the bot trade checks and save state')
+    commands.add_parser('render', help='Rebuild the dashboard from saved state and cached prices')
+    commands.add_parser('report', help='Print standings and risk metrics from saved state and cached prices')
+    commands.add_parser('backtest', add_help=False, help='Backtest the bots (options as for backtest.py)')
     
-    # Get all unique tickers
+    # Everything after `backtest` belongs to the backtester's own parser
+    args, rest = parser.parse_known_args(argv)
+    if args.command == 'backtest':
+        args.backtest_args = rest
+    elif rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args
+
+def load_state(read_only=False):
+    """Load portfolios and the journal behind them (read_only: without writing any state)"""
+    with stage('load'):
+        journal = Journal(read_only=read_only)
+        portfolios = initialize_portfolios(journal, read_only=read_only)
+    return portfolios, journal
+
+def collect_tickers(portfolios):
+    """Every held ticker plus the bots' universe and alternatives"""
     all_tickers = set()
     for key, port in portfolios.items():
-        if port and 'holdings' in port:
-            for h in port['holdings']:
-                all_tickers.add(h['ticker'])
+        if port and port.holdings:
+            for h in port.holdings:
+                all_tickers.add(h.ticker)
     
     # Add alternatives
-    all_tickers.update(['MSFT', 'AAPL', 'GOOGL', 'AMZN', 'META', 'PM', 'JPM', 'WFC', 'COP', 'PFE', 'BAC'])
+    all_tickers.update(BOT_ALTERNATIVES + BOT_TICKERS)
+    return sorted(all_tickers)
+
+def load_prices(portfolios, offline=False, refresh=False, server=QUOTE_SERVER):
+    """Current prices (cached per trading session)"""
+    with stage('fetch'):
+        return get_prices(collect_tickers(portfolios), offline=offline, refresh=refresh, server=server)
+
+def ensure_bots(portfolios, current_prices, journal, config_dir=CONFIG_DIR):
+    """Initialize configured bots that don't have any state yet"""
+    missing = [key for key, port in portfolios.items() if port is None]
+    if not missing:
+        return
     
-    # Fetch current prices
-    current_prices = fetch_current_prices(sorted(all_tickers))
+    config = load_config(config_dir)
+    print(f"\n🤖 Initializing {len(missing)} bot portfolios with current prices...")
+    for key in missing:
+        definition = config[key]
+        portfolios[key] = initialize_bot_portfolio(definition['name'], definition['sellThreshold'],
+                                                   current_prices, definition['emoji'],
+                                                   definition.get('initial', DEFAULT_INITIAL),
+                                                   definition.get('strategy'))
+        journal.record_portfolio(key, portfolios[key])
+    print("✅ Bots initialized!")
+
+def make_selector(args, session):
+    """Replacement picker for a session (deterministic for a given session and seed)"""
+    seed = default_seed(session) if args.seed is None else args.seed
+    return AlternativeSelector(args.selector, seed, PriceHistory(), session)
+
+def session_prices(history, tickers, day):
+    """Closes of a past session from the history store (only bars dated that session)"""
+    prices = {}
+    for ticker in tickers:
+        closes = history.read(ticker, start=day, end=day)['close']
+        if len(closes) and closes[-1] == closes[-1]:  # Skip NaN closes
+            prices[ticker] = round(float(closes[-1]), 2)
+    return prices
+
+def catch_up(args, portfolios, journal, session, metrics=None):
+    """Replay the trade checks of sessions missed since the last run, oldest first
+
+    The missing bars are already in the history store (each fetch downloads
+    everything after the last stored date in one batched request), so the
+    replay runs in memory; the caller saves once at the end. It stops at
+    the first session with no stored bars, leaving it and everything after
+    it unrecorded so a later run retries them.
+    """
+    if not journal.last_session:
+        return []
+    missed = sessions_between(datetime.date.fromisoformat(journal.last_session), session)
+    if not missed:
+        return []
     
-    # Initialize bots on first run
-    if not portfolios['conservative']:
-        print("\n🤖 Initializing bot portfolios with current prices...")
-        portfolios['conservative'] = initialize_bot_portfolio('Conservative Bot', -10, current_prices)
-        portfolios['moderate'] = initialize_bot_portfolio('Moderate Bot', -7, current_prices)
-        portfolios['aggressive'] = initialize_bot_portfolio('Aggressive Bot', -5, current_prices)
-        print("✅ Bots initialized!")
+    print(f"\n⏪ Catching up {len(missed)} missed session(s): {missed[0]} → {missed[-1]}")
+    history = PriceHistory()
+    tickers = collect_tickers(portfolios)
+    trades = []
+    done = 0
+    with stage('catch_up'):
+        for day in missed:
+            prices = session_prices(history, tickers, day)
+            if not prices:
+                print(f"  ✗ {day}: No stored bars yet, stopping (retried next run)")
+                break
+            # Portfolios created after this session (e.g. a newly configured bot) sit it out
+            started = {key: port for key, port in portfolios.items()
+                       if port and port.start_date <= day.isoformat()}
+            # ...as do bots that already traded that day (e.g. while streaming), and
+            # bots that traded in a later session, whose holdings are past this one
+            bots = bot_keys(portfolios)
+            later = traded_after(portfolios, day, bots)
+            if later:
+                print(f"  ↷ {day}: {', '.join(sorted(later))} already traded in a later session, skipped")
+            skip = set(portfolios) - set(started) | traded_on(portfolios, day, bots) | later
+            selector = make_selector(args, day)
+            inputs = _trade_inputs(portfolios, skip)
+            # Trades are stamped with the close of the session they belong to, in
+            # naive local time like every other trade date
+            as_of = session_close(day).astimezone().replace(tzinfo=None)
+            day_trades = check_bot_trades(portfolios, prices, journal, selector, skip=skip, as_of=as_of)
+            record_run(day, selector, prices, inputs, day_trades)
+            journal.record_session(day)
+            if metrics is not None:
+                valuation = Valuation(started, prices)
+                metrics.update(day, {key: valuation.value(key) for key in valuation.keys})
+            trades.extend(day_trades)
+            done += 1
+    print(f"✅ Caught up {done}/{len(missed)} session(s) • {len(trades)} trades")
+    return trades
+
+def caught_up(journal, session):
+    """Whether every session before `session` has been run"""
+    if not journal.last_session:
+        return True
+    return not sessions_between(datetime.date.fromisoformat(journal.last_session), session)
+
+def trade_and_save(args, portfolios, current_prices, journal, session, metrics=None):
+    """Run the bot trade checks (catching up missed sessions first), log the run and save state
+
+    Offline runs trade on cached prices that may be stale, so they neither
+    catch up nor mark the session as run; the next online run does both.
+    """
+    rotate_run_log(session)
+    if args.offline:
+        print("\n📦 Offline: missed sessions are left for the next online run")
+    elif not args.no_catch_up:
+        catch_up(args, portfolios, journal, session, metrics)
     
-    # Check for autonomous trades
     print("\n🔍 Checking bots for trading opportunities...")
-    trades = check_bot_trades(portfolios, current_prices)
+    with stage('trade'):
+        # Bots that already traded intraday (--stream) have made their one trade
+        skip = traded_on(portfolios, session, bot_keys(portfolios))
+        selector = make_selector(args, session)
+        inputs = _trade_inputs(portfolios, skip)
+        trades = check_bot_trades(portfolios, current_prices, journal, selector, skip=skip)
+        record_run(session, selector, current_prices, inputs, trades)
+        # Only mark the session once nothing before it is left to catch up
+        complete = args.no_catch_up or caught_up(journal, session)
+        if not args.offline and complete and journal.last_session != session.isoformat():
+            journal.record_session(session)
     
     if not trades:
         print("  ℹ️  No trades triggered today - all bots holding positions")
     
-    # Save data
+    # Save data (trades are already in the journal)
     print("\n💾 Saving portfolio data...")
-    with open(DATA_FILE, 'w') as f:
-        json.dump(portfolios, f, indent=2)
-    print("✅ Data saved!")
-    
-    # Generate HTML
+    with stage('save'):
+        save_portfolios(portfolios, journal, force=args.snapshot, compact=args.compact_state)
+    return trades
+
+def render(portfolios, valuation, metrics):
+    """Write the dashboard"""
     print("\n🎨 Generating HTML dashboard...")
-    html = generate_html(portfolios, current_prices)
-    
-    with open('index.html', 'w') as f:
-        f.write(html)
-    print("✅ Dashboard created: index.html")
-    
-    # Show summary
+    with stage('render'):
+        written = write_dashboard(portfolios, valuation, metrics=metrics)
+    shell = 'rewritten' if written['shell'] else 'unchanged'
+    print(f"✅ Dashboard data updated: {written['dataBytes'] / 1024:.1f} KB, "
+          f"{written['pages']} trade pages written ({DASHBOARD_FILE} {shell})")
+
+def print_summary(portfolios, valuation, metrics=None):
+    """Standings table (with risk metrics when given)"""
     print("\n" + "="*80)
     print("📊 PORTFOLIO SUMMARY")
     print("="*80)
-    for key in ['ceri', 'assisted', 'conservative', 'moderate', 'aggressive']:
+    for key in portfolios:
         if portfolios[key]:
-            value = calculate_portfolio_value(portfolios[key], current_prices)
-            change = value - portfolios[key]['initial']
-            change_pct = (change / portfolios[key]['initial']) * 100
-            print(f"{portfolios[key]['emoji']} {portfolios[key]['name']:20s} ${value:>10,.0f} ({change_pct:>+7.2f}%)")
+            value = valuation.value(key)
+            change, change_pct = valuation.pnl(key)
+            line = f"{portfolios[key].emoji} {portfolios[key].name:20s} ${value:>10,.0f} ({change_pct:>+7.2f}%)"
+            summary = metrics.summary(key) if metrics else None
+            if summary:
+                sharpe = '—' if summary['sharpe'] is None else f"{summary['sharpe']:.2f}"
+                line += f"  max DD {summary['maxDrawdown'] * 100:6.2f}%  Sharpe {sharpe:>5}"
+            print(line)
+
+def run(args):
+    """One tracker run: load, fetch, trade, save, render and summarize"""
+    portfolios, journal = load_state()
+    current_prices = load_prices(portfolios, args.offline, args.refresh, args.quote_server)
+    ensure_bots(portfolios, current_prices, journal)
+    session = current_session()
+    
+    if args.stream:
+        with stage('stream'):
+            run_streaming(args, portfolios, current_prices, journal, make_selector(args, session))
+        return
+    
+    metrics = EquityMetrics()
+    trade_and_save(args, portfolios, current_prices, journal, session, metrics)
+    
+    # Value every portfolio once for the rest of the run
+    with stage('valuation'):
+        valuation = Valuation(portfolios, current_prices)
+    
+    # Add today's point to each equity curve and its running risk statistics
+    with stage('metrics'):
+        metrics.update(session, {key: valuation.value(key) for key in valuation.keys})
+        metrics.save()
+    
+    render(portfolios, valuation, metrics)
+    print_summary(portfolios, valuation)
     
     print("\n✅ Run complete! Dashboard updated at GitHub Pages URL")
     print("="*80)
 
+def cmd_fetch(args):
+    """Refresh prices and history without trading"""
+    portfolios, _ = load_state()
+    prices = load_prices(portfolios, args.offline, args.refresh, args.quote_server)
+    print(f"\n✅ {sum(1 for p in prices.values() if p)}/{len(prices)} prices available")
+
+def cmd_trade(args):
+    """Trade checks and save, without rendering"""
+    portfolios, journal = load_state()
+    current_prices = load_prices(portfolios, args.offline, args.refresh, args.quote_server)
+    ensure_bots(portfolios, current_prices, journal)
+    trade_and_save(args, portfolios, current_prices, journal, current_session())
+
+def _cached_view():
+    """Saved state valued at cached prices (never touches the network or writes state)"""
+    portfolios, _ = load_state(read_only=True)
+    current_prices = load_prices(portfolios, offline=True)
+    with stage('valuation'):
+        valuation = Valuation(portfolios, current_prices)
+    return portfolios, valuation, EquityMetrics()
+
+def cmd_render(args):
+    """Re-render the dashboard only"""
+    render(*_cached_view())
+
+def cmd_report(args):
+    """Print the standings only"""
+    print_summary(*_cached_view())
+
+def cmd_backtest(args):
+    """Hand over to the backtester's own CLI"""
+    import backtest
+    backtest.main(args.backtest_args)
+
+COMMANDS = {
+    None: run,
+    'fetch': cmd_fetch,
+    'trade': cmd_trade,
+    'render': cmd_render,
+    'report': cmd_report,
+    'backtest': cmd_backtest,
+}
+
+def main(argv=None):
+    """Main execution"""
+    args = parse_args(argv)
+    
+    print("="*80)
+    print("🤖 AUTONOMOUS PORTFOLIO TRACKER")
+    print("="*80)
+    print(f"⏰ Running at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S EST')}")
+    print()
+    
+    if args.replay:
+        replay_run(args.replay)
+        return
+    
+    # Time every stage (and optionally profile the whole run)
+    instrumentation.reset()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        COMMANDS[args.command](args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"🔬 Profile written: {args.profile} (inspect with python -m pstats)")
+        report = instrumentation.RUN.write_report(args.report)
+        print(f"⏱️  Run report: {args.report} ({report['wall']:.2f}s wall, {report['cpu']:.2f}s CPU)")
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+📦 LOCAL PRICE CACHE
+SQLite store of closing prices keyed by (ticker, trading session) so
+weekend, holiday and re-dispatched runs skip the network entirely
+"""
+
+import datetime
+import sqlite3
+import time
+
+from market_calendar import current_session, session_close
+
+# Cache database file
+PRICE_CACHE_FILE = 'price_cache.db'
+
+# Quotes fetched while the session is still open go stale after this many seconds
+INTRADAY_TTL = 15 * 60
+
+class PriceCache:
+    """Closing prices per ticker and session"""
+
+    def __init__(self, path=PRICE_CACHE_FILE):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS prices (
+                ticker TEXT NOT NULL,
+                session TEXT NOT NULL,
+                price REAL NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (ticker, session)
+            )
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def fresh(self, tickers, now=None):
+        """Prices still valid for the current session"""
+        session = current_session(now)
+        fetched_now = (now or datetime.datetime.now(datetime.timezone.utc)).timestamp()
+        closed_at = session_close(session).timestamp()
+
+        prices = {}
+        for ticker, price, fetched_at in self._select(
+                'SELECT ticker, price, fetched_at FROM prices WHERE session = ? AND ticker IN ({})',
+                [session.isoformat()], tickers):
+            # A quote taken after the bell is the final close for the session;
+            # earlier ones are intraday and only good for a short while
+            if fetched_at >= closed_at or fetched_now - fetched_at < INTRADAY_TTL:
+                prices[ticker] = price
+        return prices
+
+    def latest(self, tickers):
+        """Most recent cached price per ticker, however old (offline mode)"""
+        return {
+            ticker: price
+            for ticker, price in self._select(
+                'SELECT ticker, price FROM prices p WHERE ticker IN ({}) '
+                'AND session = (SELECT MAX(session) FROM prices WHERE ticker = p.ticker)',
+                [], tickers)
+        }
+
+    def store(self, prices, now=None, fetched_at=None):
+        """Record freshly fetched prices against the current session
+
+        fetched_at maps tickers to when their quote was actually taken
+        (e.g. served from a quote server's cache); others count as taken now.
+        """
+        session = current_session(now).isoformat()
+        stamp = (now.timestamp() if now else time.time())
+        fetched_at = fetched_at or {}
+        rows = [(ticker, session, price, fetched_at.get(ticker, stamp))
+                for ticker, price in prices.items() if price is not None]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO prices (ticker, session, price, fetched_at) VALUES (?, ?, ?, ?)',
+                rows)
+
+    def _select(self, query, params, tickers):
+        """Run a query with an IN (...) list of tickers"""
+        tickers = list(tickers)
+        if not tickers:
+            return []
+        placeholders = ','.join('?' * len(tickers))
+        return self.conn.execute(query.format(placeholders), params + tickers).fetchall()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+📈 HISTORICAL PRICE STORE
+Append-only columnar store of daily OHLCV bars, one memory-mapped
+NumPy file per ticker. Runs append only the sessions they have not
+seen yet, and range reads touch just the slice they ask for. A ticker
+whose re-fetched bars no longer match the stored ones (Yahoo adjusts
+earlier sessions retroactively after a split) is replaced as a whole.
+"""
+
+import datetime
+import os
+from pathlib import Path
+
+import numpy as np
+
+from instrumentation import record_io
+
+# Store directory (one <TICKER>.bin file per symbol)
+HISTORY_DIR = 'price_history'
+
+# On-disk record layout; changing it means starting a new store
+BAR_DTYPE = np.dtype([
+    ('date', 'M8[D]'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+# Relative difference in a re-fetched session's price that means earlier
+# sessions were restated (splits move it by their ratio, 5:4 at the least)
+RESTATE_TOLERANCE = 0.05
+
+def frame_to_bars(frame):
+    """Convert a yfinance OHLCV DataFrame into bar records"""
+    bars = np.zeros(len(frame), dtype=BAR_DTYPE)
+    bars['date'] = np.array([ts.date() for ts in frame.index], dtype='M8[D]')
+    for field, column in (('open', 'Open'), ('high', 'High'), ('low', 'Low'),
+                          ('close', 'Close'), ('volume', 'Volume')):
+        if column in frame:
+            bars[field] = frame[column].to_numpy(dtype='f8', na_value=np.nan)
+        else:
+            bars[field] = np.nan
+    return bars
+
+def bars_to_rows(bars):
+    """Bar records as JSON-friendly [date, open, high, low, close, volume] rows (NaN -> None)"""
+    return [[str(bar['date'])] + [None if np.isnan(bar[f]) else float(bar[f]) for f in BAR_DTYPE.names[1:]]
+            for bar in bars]
+
+def rows_to_bars(rows):
+    """Inverse of bars_to_rows"""
+    bars = np.zeros(len(rows), dtype=BAR_DTYPE)
+    for i, (day, *values) in enumerate(rows):
+        bars[i] = (np.datetime64(day, 'D'), *[np.nan if v is None else v for v in values])
+    return bars
+
+class PriceHistory:
+    """Daily bars per ticker, stored as flat arrays of BAR_DTYPE records"""
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, ticker):
+        return self.root / f'{ticker}.bin'
+
+    def count(self, ticker):
+        """Number of stored sessions for a ticker"""
+        path = self.path(ticker)
+        return path.stat().st_size // BAR_DTYPE.itemsize if path.exists() else 0
+
+    def tickers(self):
+        """All tickers that have stored history"""
+        return sorted(path.stem for path in self.root.glob('*.bin'))
+
+    def last_bar(self, ticker):
+        """Most recent stored bar, read without mapping the whole file"""
+        count = self.count(ticker)
+        if not count:
+            return None
+        with open(self.path(ticker), 'rb') as f:
+            f.seek((count - 1) * BAR_DTYPE.itemsize)
+            return np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)[0]
+
+    def first_date(self, ticker):
+        """Date of the oldest stored session (or None)"""
+        if not self.count(ticker):
+            return None
+        with open(self.path(ticker), 'rb') as f:
+            return np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)[0]['date'].astype(datetime.date)
+
+    def last_date(self, ticker):
+        """Date of the most recent stored session (or None)"""
+        bar = self.last_bar(ticker)
+        return None if bar is None else bar['date'].astype(datetime.date)
+
+    def last_close(self, ticker):
+        """Most recent stored close (or None)"""
+        bar = self.last_bar(ticker)
+        if bar is None or np.isnan(bar['close']):
+            return None
+        return float(bar['close'])
+
+    def read(self, ticker, start=None, end=None):
+        """Bars with start <= date <= end as a read-only memory-mapped slice"""
+        count = self.count(ticker)
+        if not count:
+            return np.zeros(0, dtype=BAR_DTYPE)
+
+        bars = np.memmap(self.path(ticker), dtype=BAR_DTYPE, mode='r', shape=(count,))
+        dates = bars['date']
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'D'), side='left'))
+        hi = count if end is None else int(np.searchsorted(dates, np.datetime64(end, 'D'), side='right'))
+        return bars[lo:hi]
+
+    def restated(self, ticker, bars):
+        """Whether fetched bars disagree with the last stored session they overlap
+
+        The open is compared where both have one, since unlike a mid-day
+        close it doesn't change once the session has started.
+        """
+        last = self.last_bar(ticker)
+        if last is None:
+            return False
+        overlap = np.asarray(bars, dtype=BAR_DTYPE)
+        overlap = overlap[overlap['date'] == last['date']]
+        if not len(overlap):
+            return False
+        fetched = overlap[-1]
+        field = 'close' if np.isnan(last['open']) or np.isnan(fetched['open']) else 'open'
+        if np.isnan(last[field]) or np.isnan(fetched[field]) or not last[field]:
+            return False
+        return abs(fetched[field] / last[field] - 1) > RESTATE_TOLERANCE
+
+    def replace(self, ticker, bars):
+        """Atomically swap a ticker's whole history for `bars`; returns how many were written"""
+        bars = np.sort(np.asarray(bars, dtype=BAR_DTYPE), order='date')
+        path = self.path(ticker)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(bars.tobytes())
+            record_io('written', bars.nbytes, path)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return len(bars)
+
+    def append(self, ticker, bars):
+        """Append bars newer than what is stored; returns how many were written
+
+        A bar for the last stored date replaces it, so a session captured
+        mid-day is finalized by the next run instead of being duplicated.
+        """
+        bars = np.sort(np.asarray(bars, dtype=BAR_DTYPE), order='date')
+        if not len(bars):
+            return 0
+
+        path = self.path(ticker)
+        count = self.count(ticker)
+        last = self.last_bar(ticker)
+        if last is not None:
+            bars = bars[bars['date'] >= last['date']]
+            if not len(bars):
+                return 0
+            if bars[0]['date'] == last['date']:
+                # Drop the stored (possibly partial) bar for that session
+                with open(path, 'r+b') as f:
+                    f.truncate((count - 1) * BAR_DTYPE.itemsize)
+
+        with open(path, 'ab') as f:
+            f.write(bars.tobytes())
+            record_io('written', bars.nbytes, path)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(bars)
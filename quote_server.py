@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+🛰️ LOCAL QUOTE SERVER
+Optional long-running daemon that several tracker processes can share
+for quotes. It keeps one upstream client alive (so HTTP connections are
+reused across requests), caches quotes for INTRADAY_TTL seconds, and
+merges concurrent requests for the same symbol into a single upstream
+fetch. Clients talk to it over localhost HTTP, each holding one
+keep-alive connection that is reopened if the server drops it:
+
+    GET /quotes?tickers=AAPL,MSFT   ->  {"AAPL": {"price": 123.45, "fetchedAt": <epoch>}, ...}
+    GET /bars?AAPL=2026-10-14&MSFT= ->  {"AAPL": [[date, open, high, low, close, volume], ...]}
+    GET /stats                      ->  request / cache / upstream counters
+
+fetchedAt is when the quote was taken upstream (not when it was served),
+so clients can tell an intraday quote from a final close. /bars returns
+the daemon's stored daily bars from each given date on (all of them for
+an empty date), so clients keep their own price history in step. The
+daemon keeps those bars in its own store (SERVER_HISTORY_DIR), never in
+a tracker's price_history/, so the two never write the same files.
+
+Usage: python quote_server.py [--port 8765] [--ttl 900] [--history-dir DIR] [--stub [--latency 0.2]]
+Then run the tracker with --quote-server http://127.0.0.1:8765 (or set
+PORTFOLIO_QUOTE_SERVER).
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from price_cache import INTRADAY_TTL
+from price_history import HISTORY_DIR, PriceHistory, bars_to_rows
+
+DEFAULT_PORT = 8765
+
+# The daemon's own history store (kept apart from the trackers' HISTORY_DIR)
+SERVER_HISTORY_DIR = 'quote_server_history'
+
+# Longest a request waits on another request's fetch of the same symbol
+COALESCE_TIMEOUT = 60
+
+class StubUpstream:
+    """Deterministic offline quotes (md5 of the ticker), with optional latency"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, tickers):
+        self.calls += 1
+        time.sleep(self.latency)
+        return {t: round(20 + int(hashlib.md5(t.encode()).hexdigest(), 16) % 40000 / 100, 2)
+                for t in tickers}
+
+def yahoo_upstream(tickers, history=None):
+    """Fetch through the tracker's own batched Yahoo path (updating the daemon's history store)"""
+    from portfolio_tracker import fetch_current_prices
+    return fetch_current_prices(tickers, server=None, history=history)
+
+class QuoteService:
+    """Quote cache that coalesces concurrent requests for the same symbols"""
+
+    def __init__(self, upstream, ttl=INTRADAY_TTL, clock=time.monotonic, wall=time.time, history=None):
+        self.upstream = upstream
+        self.ttl = ttl
+        self.clock = clock
+        self.wall = wall
+        self.history = history  # Store the upstream appends to, served by /bars
+        self.lock = threading.Lock()
+        self.cache = {}     # ticker -> (price, fetched_at, fetched_at as epoch seconds)
+        self.inflight = {}  # ticker -> Event set when its fetch finishes
+        self.stats = {'requests': 0, 'tickers': 0, 'cacheHits': 0, 'coalesced': 0,
+                      'upstreamCalls': 0, 'upstreamTickers': 0, 'upstreamErrors': 0}
+
+    def quotes(self, tickers):
+        """{'price', 'fetchedAt'} (or None) for each ticker"""
+        prices, waiting, fetch = {}, {}, []
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['tickers'] += len(tickers)
+            now = self.clock()
+            for ticker in tickers:
+                hit = self.cache.get(ticker)
+                if hit and now - hit[1] < self.ttl:
+                    prices[ticker] = hit
+                    self.stats['cacheHits'] += 1
+                elif ticker in self.inflight:
+                    # Someone is already fetching it: wait for their result
+                    waiting[ticker] = self.inflight[ticker]
+                    self.stats['coalesced'] += 1
+                else:
+                    self.inflight[ticker] = threading.Event()
+                    fetch.append(ticker)
+            if fetch:
+                self.stats['upstreamCalls'] += 1
+                self.stats['upstreamTickers'] += len(fetch)
+
+        if fetch:
+            try:
+                fetched = self.upstream(fetch)
+            except Exception as e:
+                print(f"  ✗ Upstream error for {len(fetch)} tickers: {e}")
+                fetched = {}
+                with self.lock:
+                    self.stats['upstreamErrors'] += 1
+            with self.lock:
+                now, stamp = self.clock(), self.wall()
+                for ticker in fetch:
+                    price = fetched.get(ticker)
+                    prices[ticker] = None
+                    if price is not None:
+                        self.cache[ticker] = prices[ticker] = (price, now, stamp)
+                    self.inflight.pop(ticker).set()
+
+        for ticker, done in waiting.items():
+            done.wait(COALESCE_TIMEOUT)
+            with self.lock:
+                prices[ticker] = self.cache.get(ticker)
+
+        return {ticker: {'price': prices[ticker][0], 'fetchedAt': prices[ticker][2]} if prices.get(ticker) else None
+                for ticker in tickers}
+
+    def bars(self, since):
+        """Stored bars per ticker from each date in `since` on (ticker -> date or None)"""
+        if self.history is None:
+            return {}
+        return {ticker: bars_to_rows(self.history.read(ticker, start=start)) for ticker, start in since.items()}
+
+class QuoteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep client connections alive
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == '/quotes':
+            query = urllib.parse.parse_qs(url.query)
+            tickers = [t for t in ','.join(query.get('tickers', [])).split(',') if t]
+            self._reply(self.server.service.quotes(tickers))
+        elif url.path == '/bars':
+            query = urllib.parse.parse_qs(url.query, keep_blank_values=True)
+            self._reply(self.server.service.bars({ticker: dates[0] or None for ticker, dates in query.items()}))
+        elif url.path == '/stats':
+            with self.server.service.lock:
+                self._reply(dict(self.server.service.stats, cached=len(self.server.service.cache)))
+        else:
+            self.send_error(404)
+
+    def _reply(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(service, host='127.0.0.1', port=DEFAULT_PORT):
+    """HTTP server bound to localhost (port 0 picks a free one)"""
+    server = ThreadingHTTPServer((host, port), QuoteHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+# One keep-alive connection per server for the life of the client process
+_connections = {}
+
+def _get(url, path, timeout):
+    """GET a JSON document over the pooled connection, reconnecting once if it dropped"""
+    parts = urllib.parse.urlsplit(url)
+    for attempt in range(2):
+        conn = _connections.get(parts.netloc)
+        if conn is None:
+            conn = _connections[parts.netloc] = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+        conn.timeout = timeout
+        if conn.sock:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request('GET', f"{parts.path.rstrip('/')}{path}")
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            del _connections[parts.netloc]
+            if attempt:
+                raise OSError(f"quote server request failed: {e}") from e
+            continue
+        if response.status != 200:
+            raise OSError(f"quote server returned HTTP {response.status}")
+        return json.loads(body)
+
+def fetch_quotes(tickers, url, timeout=15):
+    """Client side: {'price', 'fetchedAt'} (or None) per ticker from a running quote server"""
+    query = urllib.parse.urlencode({'tickers': ','.join(tickers)})
+    quotes = _get(url, f'/quotes?{query}', timeout)
+    return {ticker: quotes.get(ticker) for ticker in tickers}
+
+def fetch_bars(since, url, timeout=15):
+    """Client side: the server's stored bars from each date on (ticker -> date or None)"""
+    query = urllib.parse.urlencode({ticker: start.isoformat() if start else '' for ticker, start in since.items()})
+    return _get(url, f'/bars?{query}', timeout)
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared local quote server for tracker processes')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--ttl', type=float, default=INTRADAY_TTL, help='Seconds a quote stays cached')
+    parser.add_argument('--stub', action='store_true', help='Serve deterministic offline quotes')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated upstream latency (with --stub)')
+    parser.add_argument('--history-dir', default=SERVER_HISTORY_DIR, help="The daemon's daily bar store")
+    args = parser.parse_args()
+    if os.path.realpath(args.history_dir) == os.path.realpath(HISTORY_DIR):
+        parser.error(f"--history-dir must not be the trackers' {HISTORY_DIR}/ (clients copy bars into it)")
+
+    if args.stub:
+        service = QuoteService(StubUpstream(args.latency), args.ttl)
+    else:
+        # yahoo_upstream appends everything it downloads to this store
+        history = PriceHistory(args.history_dir)
+        service = QuoteService(lambda tickers: yahoo_upstream(tickers, history), args.ttl, history=history)
+    server = make_server(service, port=args.port)
+    print(f"🛰️  Quote server on http://127.0.0.1:{server.server_address[1]} "
+          f"({'stub' if args.stub else 'Yahoo Finance'} upstream, {args.ttl:g}s cache)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Quote server stopped")
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
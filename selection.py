@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+🎯 ALTERNATIVE SELECTION
+Pluggable rules for picking the replacement stock when a bot sells.
+Every rule is deterministic given its inputs: 'random' draws from a
+seeded generator, the others rank candidates on stored price history
+as of the session being traded, so any run can be replayed exactly.
+"""
+
+import datetime
+import random
+
+import numpy as np
+
+# Available rules
+SELECTORS = ['random', 'first', 'momentum', 'low_volatility']
+
+# Sessions of history used by the ranking rules
+LOOKBACK = 20
+
+def default_seed(session):
+    """Seed derived from the trading session, so reruns of a day pick the same stocks"""
+    return int(session.strftime('%Y%m%d'))
+
+class AlternativeSelector:
+    """Chooses one ticker from the priced alternatives"""
+
+    def __init__(self, rule='random', seed=0, history=None, as_of=None, lookback=LOOKBACK):
+        if rule not in SELECTORS:
+            raise ValueError(f"Unknown selector '{rule}' (choose from {', '.join(SELECTORS)})")
+        if rule in ('momentum', 'low_volatility') and history is None:
+            raise ValueError(f"Selector '{rule}' needs price history")
+        self.rule = rule
+        self.seed = seed
+        self.history = history
+        self.as_of = as_of
+        self.lookback = lookback
+        self.rng = random.Random(seed)
+        self._scores = {}
+
+    def describe(self):
+        """Everything needed to rebuild this selector for a replay"""
+        return {
+            'rule': self.rule,
+            'seed': self.seed,
+            'lookback': self.lookback,
+            'asOf': self.as_of.isoformat() if self.as_of else None,
+        }
+
+    def pick(self, candidates):
+        """Pick from candidates (priced alternatives, in preference order)"""
+        if self.rule == 'random':
+            return self.rng.choice(candidates)
+        if self.rule == 'first':
+            return candidates[0]
+
+        scored = [(self._score(ticker), i) for i, ticker in enumerate(candidates)]
+        scored = [(score, i) for score, i in scored if score is not None]
+        if not scored:
+            # No usable history for any candidate: fall back to list order
+            return candidates[0]
+
+        # Best momentum or lowest volatility; ties go to the earlier candidate
+        sign = -1 if self.rule == 'momentum' else 1
+        return candidates[min(scored, key=lambda s: (sign * s[0], s[1]))[1]]
+
+    def _score(self, ticker):
+        if ticker not in self._scores:
+            closes = self.history.read(ticker, end=self.as_of)['close'][-(self.lookback + 1):]
+            closes = closes[~np.isnan(closes)]
+            if len(closes) < self.lookback + 1:
+                score = None
+            elif self.rule == 'momentum':
+                score = float(closes[-1] / closes[0] - 1)
+            else:
+                score = float(np.std(np.diff(np.log(closes))))
+            self._scores[ticker] = score
+        return self._scores[ticker]
+
+def from_description(description, history=None):
+    """Rebuild a selector recorded with describe()"""
+    as_of = description.get('asOf')
+    return AlternativeSelector(
+        description['rule'],
+        description['seed'],
+        history,
+        datetime.date.fromisoformat(as_of) if as_of else None,
+        description.get('lookback', LOOKBACK),
+    )
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+⚡ STATE SERIALIZATION
+Pluggable JSON encode/decode that uses orjson or msgspec when they are
+installed and falls back to the stdlib, plus a schema-checked decode
+path so a malformed portfolio_data.json fails fast instead of halfway
+through a run
+"""
+
+import json
+import numbers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKENDS = [name for name, module in (('orjson', orjson), ('msgspec', msgspec)) if module] + ['json']
+
+# Fastest installed backend
+DEFAULT_BACKEND = BACKENDS[0]
+
+DECODE_ERRORS = (ValueError, msgspec.DecodeError) if msgspec else (ValueError,)
+
+class StateError(ValueError):
+    """Raised when saved portfolio state doesn't match the expected schema"""
+
+def dumps(obj, compact=False, backend=DEFAULT_BACKEND):
+    """Encode to UTF-8 JSON bytes (2-space indented unless compact)"""
+    if backend == 'orjson':
+        return orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2)
+    if backend == 'msgspec':
+        data = msgspec.json.encode(obj)
+        return data if compact else msgspec.json.format(data, indent=2)
+    if compact:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+def loads(data, backend=DEFAULT_BACKEND):
+    """Decode JSON bytes or text"""
+    if backend == 'orjson':
+        return orjson.loads(data)
+    if backend == 'msgspec':
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+def _is_number(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_str(value):
+    return isinstance(value, str)
+
+# Schema for portfolio_data.json: field -> (type check, required)
+HOLDING_SCHEMA = {
+    'ticker': (_is_str, True),
+    'entry': (_is_number, True),
+    'shares': (_is_number, True),
+}
+
+TRADE_SCHEMA = {
+    'date': (_is_str, True),
+    'dateString': (_is_str, True),
+    'action': (_is_str, True),
+    'soldTicker': (_is_str, True),
+    'soldPrice': (_is_number, True),
+    'soldShares': (_is_number, True),
+    'boughtTicker': (_is_str, True),
+    'boughtPrice': (_is_number, True),
+    'boughtShares': (_is_number, True),
+    'reason': (_is_str, False),
+    'profitLoss': (_is_number, True),
+}
+
+PORTFOLIO_SCHEMA = {
+    'name': (_is_str, True),
+    'emoji': (_is_str, True),
+    'initial': (_is_number, True),
+    'startDate': (_is_str, True),
+    'strategy': (_is_str, False),
+    'sellThreshold': (_is_number, False),
+    'holdings': (list, True),
+    'trades': (list, False),
+    'wins': (_is_int, False),
+    'losses': (_is_int, False),
+    'resets': (_is_int, False),
+}
+
+def _check_object(obj, schema, where):
+    if not isinstance(obj, dict):
+        raise StateError(f"{where}: expected an object, got {type(obj).__name__}")
+    for field, (check, required) in schema.items():
+        if field not in obj:
+            if required:
+                raise StateError(f"{where}: missing required field '{field}'")
+            continue
+        value = obj[field]
+        ok = isinstance(value, check) if isinstance(check, type) else check(value)
+        if not ok:
+            raise StateError(f"{where}.{field}: unexpected value {value!r}")
+
+def validate_state(state):
+    """Check decoded portfolio_data.json against the schema; returns it unchanged"""
+    if not isinstance(state, dict):
+        raise StateError(f"state: expected an object, got {type(state).__name__}")
+
+    for key, port in state.items():
+        if key == '_meta' or port is None:
+            continue
+        _check_object(port, PORTFOLIO_SCHEMA, key)
+        for i, holding in enumerate(port['holdings']):
+            _check_object(holding, HOLDING_SCHEMA, f'{key}.holdings[{i}]')
+        for i, trade in enumerate(port.get('trades', [])):
+            _check_object(trade, TRADE_SCHEMA, f'{key}.trades[{i}]')
+        if 'sellThreshold' in port and 'trades' not in port:
+            raise StateError(f"{key}: bot portfolio has no 'trades' list")
+
+    return state
+
+def decode_state(data, backend=DEFAULT_BACKEND):
+    """Decode and validate saved portfolio state"""
+    try:
+        state = loads(data, backend)
+    except DECODE_ERRORS as e:
+        raise StateError(f"state is not valid JSON: {e}") from e
+    return validate_state(state)
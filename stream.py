@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+📡 STREAMING PRICE MODE
+Long-running loop that polls a price feed at a fixed interval and
+checks bot thresholds as quotes arrive, instead of once at the close.
+Only holdings whose price moved since the last tick are re-evaluated.
+A seeded simulated feed drives the same loop offline.
+"""
+
+import datetime
+import math
+import random
+import time
+
+from market_calendar import current_session
+
+class YahooFeed:
+    """Polls Yahoo Finance for the latest quotes"""
+
+    def __init__(self, tickers, fetch):
+        self.tickers = list(tickers)
+        self.fetch = fetch
+
+    def poll(self):
+        return self.fetch(self.tickers)
+
+class SimulatedFeed:
+    """Seeded random-walk quotes: each tick a fraction of the tickers move"""
+
+    def __init__(self, prices, seed=0, volatility=0.004, move_fraction=0.3):
+        self.prices = {ticker: price for ticker, price in prices.items() if price}
+        self.rng = random.Random(seed)
+        self.volatility = volatility
+        self.move_fraction = move_fraction
+
+    def poll(self):
+        for ticker, price in self.prices.items():
+            if self.rng.random() < self.move_fraction:
+                self.prices[ticker] = round(price * math.exp(self.rng.gauss(0, self.volatility)), 2)
+        return dict(self.prices)
+
+def trade_session(trade):
+    """Trading session a trade was made in (trade dates are naive local time)"""
+    return current_session(datetime.datetime.fromisoformat(trade.date))
+
+def traded_on(portfolios, day, bot_keys):
+    """Bots that already made their one trade for the session `day`
+
+    Every trade is looked at, not just the last one: a catch-up run may
+    have appended trades for earlier sessions after it. Only dates within
+    a few days of `day` are parsed.
+    """
+    lo = (day - datetime.timedelta(days=3)).isoformat()
+    hi = (day + datetime.timedelta(days=3)).isoformat()
+    traded = set()
+    for key in bot_keys:
+        port = portfolios.get(key)
+        if any(lo <= trade.date[:10] <= hi and trade_session(trade) == day
+               for trade in reversed(port and port.trades or [])):
+            traded.add(key)
+    return traded
+
+def traded_after(portfolios, day, bot_keys):
+    """Bots with a trade from a session later than `day` (too late to replay `day` for them)"""
+    return {key for key in bot_keys
+            if portfolios.get(key) and portfolios[key].trades
+            and trade_session(portfolios[key].trades[-1]) > day}
+
+def run_stream(portfolios, feed, check_trades, bot_keys, interval=60, ticks=None,
+               on_trades=None, today=current_session, sleep=time.sleep):
+    """Poll the feed and check thresholds incrementally until stopped
+
+    check_trades(prices, tickers, skip) evaluates only holdings of the given
+    tickers (None = all) for bots not in `skip`. The first tick of each day
+    is a full evaluation; later ticks only look at tickers whose price moved.
+    """
+    last = {}
+    day = None
+    traded = set()
+    tick = 0
+    evaluated = 0
+    trades_made = []
+
+    try:
+        while ticks is None or tick < ticks:
+            quotes = feed.poll()
+            now = today()
+            if now != day:
+                day = now
+                traded = traded_on(portfolios, day, bot_keys)
+                moved = None
+            else:
+                moved = {t for t, p in quotes.items() if p is not None and p != last.get(t)}
+            last.update({t: p for t, p in quotes.items() if p is not None})
+
+            # Nothing to do once every bot has made its trade for the day
+            if (moved is None or moved) and len(traded) < len(bot_keys):
+                evaluated += len(moved) if moved is not None else len(last)
+                trades = check_trades(last, moved, traded)
+                for key, _ in trades:
+                    traded.add(key)
+                trades_made.extend(trades)
+                if trades and on_trades:
+                    on_trades(trades, last)
+
+            tick += 1
+            if ticks is None or tick < ticks:
+                sleep(interval)
+    except KeyboardInterrupt:
+        print("\n⏹️  Stream stopped")
+
+    print(f"📡 {tick} ticks • {evaluated} ticker updates evaluated • {len(trades_made)} trades")
+    return trades_made
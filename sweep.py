@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+🧪 STRATEGY PARAMETER SWEEP
+Expands a grid of bot parameters (sell threshold, position size,
+universe, alternatives, picking rule, seeds) and runs the backtester
+over it on a process pool. The price matrix is placed in shared memory
+once and every worker maps it directly, and equity curves are written
+back into a shared output array, so nothing large is pickled per task.
+
+Usage: python sweep.py grid.json [--workers N] [--output sweep_results]
+
+Example grid.json:
+    {
+        "thresholds": [-3, -5, -7, -10, -15],
+        "position_sizes": [5000, 10000],
+        "universes": {"bots": ["AVGO", "PM", "JPM", "WFC", "NVDA", "COP", "PFE", "TGT", "MO", "BAC"]},
+        "alternatives": {"megacaps": ["MSFT", "AAPL", "GOOGL", "AMZN", "META"]},
+        "pickers": ["random", "first"],
+        "seeds": 20,
+        "start": "2021-01-01"
+    }
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backtest import (BacktestResult, TRADE_DTYPE, first_session, load_price_matrix, make_config, run_backtest,
+                      write_results)
+from portfolio_tracker import BOT_TICKERS, BOT_ALTERNATIVES, BOT_POSITION_SIZE
+from selection import LOOKBACK
+
+def expand_grid(grid):
+    """Every combination in a sweep grid, as backtest configurations"""
+    universes = grid.get('universes') or {'bots': BOT_TICKERS}
+    alternatives = grid.get('alternatives') or {'default': BOT_ALTERNATIVES}
+    pickers = grid.get('pickers') or ['random']
+    seeds = range(grid.get('seeds', 1))
+
+    configs = []
+    for threshold, size, (u_name, universe), (a_name, alts), picker in itertools.product(
+            grid.get('thresholds', [-5, -7, -10]), grid.get('position_sizes', [BOT_POSITION_SIZE]),
+            universes.items(), alternatives.items(), pickers):
+        # Seeds only matter for random picks
+        for seed in (seeds if picker == 'random' else [0]):
+            config = make_config(threshold, universe, alts, size, picker, seed)
+            config.update(universeName=u_name, alternativesName=a_name)
+            configs.append(config)
+    return configs
+
+# Worker-side views of the shared arrays (set once per process)
+_shared = {}
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    _shared.setdefault('blocks', []).append(shm)  # Keep the mapping alive
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _init_worker(prices_spec, equity_spec, dates, tickers, first):
+    _shared['closes'] = _attach(*prices_spec)
+    _shared['equity'] = _attach(*equity_spec)
+    _shared['dates'] = dates
+    _shared['tickers'] = tickers
+    _shared['first'] = first
+
+def _run_chunk(offset, configs):
+    """Backtest a slice of the grid, writing equity into the shared output"""
+    result = run_backtest(configs, _shared['dates'], _shared['closes'], _shared['tickers'], _shared['first'])
+    _shared['equity'][offset:offset + len(configs)] = result.equity
+    trades = result.trades
+    trades['config'] += offset
+    return trades
+
+def _shared_array(shape, dtype):
+    """Allocate a NumPy array in a new shared memory block"""
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def run_sweep(configs, start=None, end=None, workers=None, chunks=None, history=None):
+    """Run every configuration across a process pool; returns a BacktestResult"""
+    workers = workers or os.cpu_count() or 1
+    tickers = sorted({t for c in configs for t in c['universe'] + c['alternatives']})
+    dates, closes = load_price_matrix(tickers, start, end, history, warmup=LOOKBACK)
+    first = first_session(dates, start)
+    if first == len(dates):
+        raise ValueError('No stored history for the requested tickers/range; run the tracker first')
+
+    prices_shm, shared_closes = _shared_array(closes.shape, closes.dtype)
+    equity_shm, shared_equity = _shared_array((len(configs), len(dates) - first), np.float64)
+    try:
+        shared_closes[:] = closes
+
+        # One contiguous slice per task keeps each worker's arrays wide
+        chunks = chunks or workers
+        size = -(-len(configs) // chunks)
+        slices = [(offset, configs[offset:offset + size]) for offset in range(0, len(configs), size)]
+
+        init_args = ((prices_shm.name, closes.shape, closes.dtype),
+                     (equity_shm.name, shared_equity.shape, shared_equity.dtype),
+                     dates, tickers, first)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+            futures = [pool.submit(_run_chunk, offset, chunk) for offset, chunk in slices]
+            trades = [future.result() for future in futures]
+
+        trades = np.concatenate(trades) if trades else np.zeros(0, dtype=TRADE_DTYPE)
+        trades = trades[np.argsort(trades['day'], kind='stable')]
+        return BacktestResult(configs, tickers, dates[first:], shared_equity.copy(), trades)
+    finally:
+        for shm in (prices_shm, equity_shm):
+            shm.close()
+            shm.unlink()
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep bot strategy parameters across CPU cores')
+    parser.add_argument('grid', help='JSON file describing the parameter grid')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--chunks', type=int, help='Tasks to split the grid into (default: one per worker)')
+    parser.add_argument('--output', default='sweep_results')
+    args = parser.parse_args()
+
+    with open(args.grid) as f:
+        grid = json.load(f)
+    configs = expand_grid(grid)
+    start = grid.get('start') and datetime.date.fromisoformat(grid['start'])
+    end = grid.get('end') and datetime.date.fromisoformat(grid['end'])
+
+    print(f"🧪 Sweeping {len(configs)} configurations on {args.workers} workers...")
+    began = time.perf_counter()
+    result = run_sweep(configs, start, end, args.workers, args.chunks)
+    elapsed = time.perf_counter() - began
+    write_results(result, args.output)
+
+    print(f"✅ {len(configs)} configurations × {len(result.dates)} sessions in {elapsed:.1f}s "
+          f"• results in {args.output}/")
+    for c, row in sorted(enumerate(result.summary()), key=lambda r: -r[1]['final'])[:10]:
+        print(f"  #{c:<6} {row['threshold']:>6}% ${row['position_size']:<6} {row['universeName']}/"
+              f"{row['alternativesName']} {row['picker']}:{row['seed']:<4} "
+              f"${row['final']:>12,.0f} ({row['returnPct']:+.2f}%) {row['trades']} trades")
+
+if __name__ == '__main__':
+    main()
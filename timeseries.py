@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+📉 EQUITY TIME SERIES
+Multi-resolution rollups of a daily [day, value] series (weekly and
+monthly closes, extended in place as each session is appended) and a
+Largest-Triangle-Three-Buckets downsampler, so a chart payload stays
+within CHART_POINTS however long the competition runs while keeping
+the curve's peaks and troughs.
+"""
+
+import datetime
+
+# Most points sent to the browser per chart
+CHART_POINTS = 100
+
+# Rollups kept next to the daily curve, finest first
+RESOLUTIONS = ('weekly', 'monthly')
+
+# Downsample from the finest series no longer than this many times the budget
+LTTB_INPUT_FACTOR = 4
+
+def period(day, resolution):
+    """The week or month a YYYY-MM-DD session belongs to"""
+    if resolution == 'weekly':
+        return datetime.date.fromisoformat(day).isocalendar()[:2]
+    return day[:7]
+
+def roll_up(rollup, day, value, resolution):
+    """Fold one session into a rollup of period closes ([last session, value] per period)"""
+    if rollup and period(rollup[-1][0], resolution) == period(day, resolution):
+        rollup[-1] = [day, value]
+    else:
+        rollup.append([day, value])
+
+def build_rollups(curve):
+    """Every rollup of a daily curve, from scratch"""
+    rollups = {resolution: [] for resolution in RESOLUTIONS}
+    for day, value in curve:
+        for resolution in RESOLUTIONS:
+            roll_up(rollups[resolution], day, value, resolution)
+    return rollups
+
+def lttb(points, budget):
+    """Largest-Triangle-Three-Buckets: pick `budget` [day, value] points that keep the shape"""
+    if len(points) <= budget:
+        return list(points)
+    if budget < 3:
+        return [points[0], points[-1]][:budget]
+
+    xs = [datetime.date.fromisoformat(day).toordinal() for day, _ in points]
+    ys = [value for _, value in points]
+    # First and last points are always kept; the rest are split into equal buckets
+    every = (len(points) - 2) / (budget - 2)
+    sampled = [points[0]]
+    a = 0
+    for i in range(budget - 2):
+        # Average of the next bucket is the triangle's third corner
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, len(points))
+        avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        best, best_area = next_start - 1, -1.0
+        for j in range(int(i * every) + 1, next_start):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+def chart_points(curve, rollups, budget=CHART_POINTS):
+    """At most `budget` points of an equity curve, from the finest resolution cheap enough to downsample"""
+    points = curve
+    for resolution in RESOLUTIONS:
+        if len(points) <= budget * LTTB_INPUT_FACTOR:
+            break
+        # Period closes, plus the very first session so the chart starts where the curve does
+        points = rollups[resolution]
+        if points[0] != curve[0]:
+            points = [curve[0]] + points
+    return lttb(points, budget)
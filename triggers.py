@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+🎯 THRESHOLD TRIGGER INDEX
+Keeps every bot holding's sell trigger price, entry * (1 + threshold/100),
+in a sorted list per ticker. A price update then only has to look at the
+holdings whose trigger is at or above the new price, instead of
+recomputing the change of every holding on every tick.
+"""
+
+from bisect import bisect_left, insort
+
+# Relative slack when searching, so float rounding in the trigger price never
+# hides a holding; candidates are re-checked with the exact percent change
+TOLERANCE = 1e-9
+
+def trigger_price(entry, threshold):
+    return entry * (1 + threshold / 100)
+
+class TriggerIndex:
+    """Sorted trigger prices of bot holdings, keyed by ticker"""
+
+    def __init__(self, portfolios, bot_keys):
+        self.levels = {}  # ticker -> sorted [(trigger, bot_key, slot)]
+        self.slots = {}   # (bot_key, slot) -> (ticker, trigger)
+        for key in bot_keys:
+            bot = portfolios.get(key)
+            if not bot:
+                continue
+            for slot, holding in enumerate(bot.holdings):
+                self._add(key, slot, holding, bot.sell_threshold)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _add(self, key, slot, holding, threshold):
+        trigger = trigger_price(holding.entry, threshold)
+        insort(self.levels.setdefault(holding.ticker, []), (trigger, key, slot))
+        self.slots[key, slot] = (holding.ticker, trigger)
+
+    def _remove(self, key, slot):
+        ticker, trigger = self.slots.pop((key, slot))
+        levels = self.levels[ticker]
+        del levels[bisect_left(levels, (trigger, key, slot))]
+        if not levels:
+            del self.levels[ticker]
+
+    def replace(self, key, slot, holding, threshold):
+        """Re-index a slot after its holding was swapped"""
+        self._remove(key, slot)
+        self._add(key, slot, holding, threshold)
+
+    def candidates(self, prices, tickers=None):
+        """Slots whose trigger may have been crossed, as {bot_key: sorted slots}"""
+        found = {}
+        for ticker in self.levels if tickers is None else tickers:
+            levels = self.levels.get(ticker)
+            price = prices.get(ticker)
+            if not levels or not price:
+                continue
+            start = bisect_left(levels, (price * (1 - TOLERANCE),))
+            for _, key, slot in levels[start:]:
+                found.setdefault(key, []).append(slot)
+        for slots in found.values():
+            slots.sort()
+        return found
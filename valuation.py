@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+🧮 VECTORIZED VALUATION ENGINE
+Packs every portfolio's holdings into NumPy arrays and values them all
+in one pass, so a run computes values once no matter how many
+portfolios (or how many places) need them
+"""
+
+import numpy as np
+
+class Valuation:
+    """Values, P/L and per-position moves for a set of portfolios at one set of prices
+
+    Holdings are packed as a sparse share matrix in coordinate form: one
+    entry per position with its portfolio row, ticker column, share count
+    and entry price.
+    """
+
+    def __init__(self, portfolios, current_prices):
+        self.keys = [key for key, port in portfolios.items() if port]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.ticker_index = {}
+
+        owner, column, shares, entry, initial = [], [], [], [], []
+        for row, key in enumerate(self.keys):
+            port = portfolios[key]
+            initial.append(port.initial)
+            for holding in port.holdings:
+                owner.append(row)
+                column.append(self.ticker_index.setdefault(holding.ticker, len(self.ticker_index)))
+                shares.append(holding.shares)
+                entry.append(holding.entry)
+
+        self.owner = np.array(owner, dtype=np.intp)
+        self.column = np.array(column, dtype=np.intp)
+        self.shares = np.array(shares, dtype=np.float64)
+        self.entry = np.array(entry, dtype=np.float64)
+        self.initial = np.array(initial, dtype=np.float64)
+        # Start offset of each portfolio's positions (holdings are packed in order)
+        self.offsets = np.searchsorted(self.owner, np.arange(len(self.keys) + 1))
+
+        self.revalue(current_prices)
+
+    def revalue(self, current_prices):
+        """Recompute every portfolio at new prices in a single vectorized pass"""
+        tickers = list(self.ticker_index)
+        quoted = np.array([ticker in current_prices for ticker in tickers], dtype=bool)
+        prices = np.array([current_prices.get(ticker) or np.nan for ticker in tickers], dtype=np.float64)
+
+        # Same rules as calculate_portfolio_value: an unquoted ticker is held
+        # at its entry price, a failed quote (None) contributes nothing
+        position_price = np.where(quoted[self.column], prices[self.column], self.entry)
+        self.position_price = position_price
+        self.position_value = np.nan_to_num(position_price * self.shares)
+        self.position_change_pct = (position_price - self.entry) / self.entry * 100
+
+        self.values = np.bincount(self.owner, weights=self.position_value, minlength=len(self.keys))
+        self.change = self.values - self.initial
+        self.change_pct = self.change / self.initial * 100
+        return self
+
+    def value(self, key):
+        return float(self.values[self.rows[key]])
+
+    def pnl(self, key):
+        """(change in $, change in %) against the portfolio's initial value"""
+        row = self.rows[key]
+        return float(self.change[row]), float(self.change_pct[row])
+
+    def position_changes(self, key):
+        """Per-holding % move from entry, in holdings order (NaN when unpriced)"""
+        row = self.rows[key]
+        return self.position_change_pct[self.offsets[row]:self.offsets[row + 1]]
+
+    def standings(self):
+        """Portfolio keys ranked by current value, best first"""
+        order = np.argsort(-self.values, kind='stable')
+        return [self.keys[row] for row in order]